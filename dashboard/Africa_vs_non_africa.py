@@ -1,9 +1,14 @@
 import streamlit as st
-import pandas as pd
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.colors import qualitative
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from utils.continent_facts import load_continent_facts, outcome_shares, rollup
+from utils.data_versions import data_versions
 
 st.set_page_config(layout="wide")
 st.markdown(
@@ -34,107 +39,13 @@ st.markdown(
 )
 
 
-@st.cache_data
-def load_data():
-    return pd.read_excel("../data/raw/litigation_cases.xlsx",
-                         skiprows=5, skipfooter=7)
-
-df = load_data()
-df['LIT Leave Decision Desc'] = (
-    df['LIT Leave Decision Desc']
-      .replace(r'^Discontinued.*', 'Discontinued', regex=True)
-      .replace(r'^Dismissed.*',    'Dismissed',    regex=True)
-      .replace(r'^Allowed.*',      'Allowed',      regex=True)
-)
+# The continent fact table is derived once per workbook version; reruns only read it.
+# The version argument keys the cache, so a replaced workbook is picked up on the next rerun.
+@st.cache_data(max_entries=1)
+def load_facts(version):
+    return load_continent_facts()
 
-continent_map = {
-    'India': 'Asia', 'Fiji': 'Oceania', 'Russia': 'Asia', 'Republic of Indonesia': 'Asia',
-    'Georgia': 'Asia', 'Nigeria': 'Africa', 'United States of America': 'North America',
-    'Lebanon': 'Asia', 'Croatia': 'Europe', 'Egypt': 'Africa', "People's Republic of China": 'Asia',
-    'Albania': 'Europe', 'Colombia': 'South America', 'Somalia, Democratic Republic of': 'Africa',
-    'Iraq': 'Asia', 'Italy': 'Europe', 'Rwanda': 'Africa', 
-    'United Kingdom and Overseas Territories': 'Europe', 'Bulgaria': 'Europe', 
-    'Ukraine': 'Europe', 'Kenya': 'Africa', 'Stateless': 'Unspecified', 'Greece': 'Europe',
-    'Syria': 'Asia', 'Jamaica': 'North America', 'Hungary': 'Europe', 'Turkey': 'Asia',
-    'Pakistan': 'Asia', 'Socialist Republic of Vietnam': 'Asia', 'Kazakhstan': 'Asia',
-    'Mexico': 'North America', 'Federal Republic of Cameroon': 'Africa',
-    'Congo, Democratic Republic of the': 'Africa', 'Namibia': 'Africa', 'Iran': 'Asia',
-    'Cambodia': 'Asia', "Korea, People's Democratic Republic of": 'Asia',
-    'Trinidad and Tobago, Republic of': 'North America', 'Peru': 'South America',
-    'Palestinian Authority (Gaza/West Bank)': 'Asia', 'St. Kitts-Nevis': 'North America',
-    'Republic of Ivory Coast': 'Africa', 'Ghana': 'Africa', 'Republic of South Africa': 'Africa',
-    'El Salvador': 'North America', 'Bangladesh': 'Asia', 'Kosovo, Republic of': 'Europe',
-    'Guinea, Republic of': 'Africa', 'Sri Lanka': 'Asia', 'Latvia': 'Europe',
-    'Hong Kong SAR': 'Asia', 'Jordan': 'Asia', 'Slovak Republic': 'Europe', 'Zimbabwe': 'Africa',
-    'St. Lucia': 'North America', 'Honduras': 'North America', 'United Republic of Tanzania': 'Africa',
-    'Nepal': 'Asia', 'St. Vincent and the Grenadines': 'North America', 'Philippines': 'Asia',
-    'Sierra Leone': 'Africa', 'Tunisia': 'Africa', 'Federal Republic of Germany': 'Europe',
-    'Togo, Republic of': 'Africa', 'Spain': 'Europe', 'Malawi': 'Africa', 'France': 'Europe',
-    'Afghanistan': 'Asia', 'Guyana': 'South America', 'Haiti': 'North America', 'Belgium': 'Europe',
-    'Kuwait': 'Asia', 'Eritrea': 'Africa', 'Algeria': 'Africa', 'Uganda': 'Africa',
-    'Democratic Republic of Sudan': 'Africa', 'Gabon Republic': 'Africa',
-    'Korea, Republic of': 'Asia', 'Chad, Republic of': 'Africa', 'Saudi Arabia': 'Asia',
-    'Brazil': 'South America', 'Mauritius': 'Africa', 'Israel': 'Asia', 'Azerbaijan': 'Asia',
-    'Argentina': 'South America', 'Portugal': 'Europe', 'Dominican Republic': 'North America',
-    'Libya': 'Africa', 'Senegal': 'Africa', 'Romania': 'Europe', 'Venezuela': 'South America',
-    'Poland': 'Europe', 'Belarus': 'Europe', 'Panama, Republic of': 'North America',
-    'Gambia': 'Africa', 'Norway': 'Europe', 'Ethiopia': 'Africa', 'Swaziland': 'Africa',
-    'Costa Rica': 'North America', 'Barbados': 'North America', 'Malaysia': 'Asia',
-    'The Netherlands': 'Europe', 'Liberia': 'Africa', 'Taiwan': 'Asia', 'Switzerland': 'Europe',
-    'Mozambique': 'Africa', 'Nicaragua': 'North America', 'Republic of Ireland': 'Europe',
-    'Burkina-Faso': 'Africa', 'Madagascar': 'Africa', 'Ecuador': 'South America',
-    'Morocco': 'Africa', 'Peoples Republic of Benin': 'Africa', 'Burundi': 'Africa',
-    'Chile': 'South America', 'Belize': 'North America', 'Republic of Djibouti': 'Africa',
-    'Mali, Republic of': 'Africa', 'Uzbekistan': 'Asia', 'Montenegro, Republic of': 'Europe',
-    'Mauritania': 'Africa', 'Angola': 'Africa', 'Armenia': 'Asia', 'Moldova': 'Europe',
-    'Yemen, Republic of': 'Asia', 'Bahama Islands, The': 'North America', 'Grenada': 'North America',
-    "Congo, People's Republic of the": 'Africa', 'Sweden': 'Europe', 'Czech Republic': 'Europe',
-    'Guinea-Bissau': 'Africa', 'Kyrgyzstan': 'Asia', 'Antigua and Barbuda': 'North America',
-    'Equatorial Guinea': 'Africa', 'Japan': 'Asia', 'Cuba': 'North America', 'Lesotho': 'Africa',
-    'Bosnia-Hercegovina': 'Europe', 'Serbia, Republic of': 'Europe', 'Guatemala': 'North America',
-    'Austria': 'Europe', 'Vanuatu': 'Oceania', 'Turkmenistan': 'Asia', 
-    'Serbia and Montenegro': 'Europe', 'Lithuania': 'Europe',
-    "Mongolia, People's Republic of": 'Asia', 'Republic of the Niger': 'Africa', 'Thailand': 'Asia',
-    'Botswana, Republic of': 'Africa', 'New Zealand': 'Oceania', 'Myanmar (Burma)': 'Asia',
-    'Unspecified': 'Unspecified', 'Bahrain': 'Asia', 'Macedonia': 'Europe', 'Singapore': 'Asia',
-    'United Arab Emirates': 'Asia', 'Surinam': 'South America', 'Bolivia': 'South America',
-    'Uruguay': 'South America', 'Australia': 'Oceania', 'Comoros': 'Africa', 'Paraguay': 'South America',
-    'Zambia': 'Africa', 'Tadjikistan': 'Asia', 'Cyprus': 'Europe', 'Qatar': 'Asia',
-    'Dominica': 'North America', 'Central African Republic': 'Africa', 'Denmark': 'Europe',
-    'Macao SAR': 'Asia', 'South Sudan, Republic Of': 'Africa', 'Estonia': 'Europe',
-    'Bhutan': 'Asia', 'Slovenia': 'Europe', 'Oman': 'Asia', 'Luxembourg': 'Europe',
-    'Solomons, The': 'Oceania', 'Laos': 'Asia', 'Finland': 'Europe', 'Iceland': 'Europe'
-}
-
-caribbean_countries = {
-    'Antigua and Barbuda': 'Caribbean',
-    'Bahamas': 'Caribbean',
-    'Barbados': 'Caribbean',
-    'Cuba': 'Caribbean',
-    'Dominica': 'Caribbean',
-    'Dominican Republic': 'Caribbean',
-    'Grenada': 'Caribbean',
-    'Haiti': 'Caribbean',
-    'Jamaica': 'Caribbean',
-    'Saint Kitts and Nevis': 'Caribbean',
-    'Saint Lucia': 'Caribbean',
-    'Saint Vincent and the Grenadines': 'Caribbean',
-    'Trinidad and Tobago': 'Caribbean',
-    'Puerto Rico': 'Caribbean',
-    'Saint Martin': 'Caribbean',
-    'Montserrat': 'Caribbean',
-    'Anguilla': 'Caribbean',
-    'British Virgin Islands': 'Caribbean',
-    'US Virgin Islands': 'Caribbean',
-    'Cayman Islands': 'Caribbean',
-    'Aruba': 'Caribbean',
-    'Saint Barthelemy': 'Caribbean',
-    'Saint Pierre and Miquelon': 'Caribbean',
-    'Guadeloupe': 'Caribbean',
-    'Martinique': 'Caribbean'
-}
-continent_map.update(caribbean_countries)
-df['continent'] = df["Country of Citizenship"].map(continent_map)
+facts = load_facts(data_versions.version("litigation"))
 
 st.header("1.Total Litigation Cases vs Dismissed Rate by Continent")
 st.markdown("""  
@@ -142,21 +53,12 @@ st.markdown("""
 - Caribbean jurisdictions, despite a moderate caseload (~2 560), see the highest refusal rate (67.7 %).
 - South America and Europe both have mid-range volumes but lower refusal rates (~47.5 – 49.9 %), highlighting that African and Caribbean cases are treated more punitively.
 """)
-total = (
-    df
-    .groupby('continent', as_index=False)['LIT Litigation Count']
-    .sum()
-    .rename(columns={'LIT Litigation Count':'total_cases'})
+cont_df = (
+    rollup(facts, ['continent'])
+    .rename(columns={'total':'total_cases', 'dismissed':'dismissed_cases'})
+    .sort_values('total_cases', ascending=False)
+    .reset_index(drop=True)
 )
-dismissed = (
-    df[df['LIT Leave Decision Desc']=='Dismissed']
-    .groupby('continent', as_index=False)['LIT Litigation Count']
-    .sum()
-    .rename(columns={'LIT Litigation Count':'dismissed_cases'})
-)
-cont_df = total.merge(dismissed, on='continent', how='left').fillna(0)
-cont_df['refusal_rate'] = cont_df['dismissed_cases'] / cont_df['total_cases'] * 100
-cont_df = cont_df.sort_values('total_cases', ascending=False).reset_index(drop=True)
 
 palette   = qualitative.Plotly
 color_map = {c: palette[i % len(palette)] for i, c in enumerate(cont_df['continent'])}
@@ -209,22 +111,8 @@ st.markdown("""
 - By contrast, Asia, Europe and South America fall below global (–5.6 pp to –1.5 pp), underscoring the specific disadvantage faced by Black-majority regions.
 """)
 
-tot = (
-    df
-    .groupby('continent')['LIT Litigation Count']
-    .sum()
-    .reset_index(name='cont_total')
-)
-dis = (
-    df[df['LIT Leave Decision Desc'] == 'Dismissed']
-    .groupby('continent')['LIT Litigation Count']
-    .sum()
-    .reset_index(name='cont_dismissed')
-)
-
-cont_all = tot.merge(dis, on='continent', how='left').fillna(0)
-cont_all['cont_rate'] = cont_all['cont_dismissed'] / cont_all['cont_total'] * 100
-global_rate = cont_all['cont_dismissed'].sum() / cont_all['cont_total'].sum() * 100
+cont_all = rollup(facts, ['continent']).rename(columns={'refusal_rate':'cont_rate'})
+global_rate = rollup(cont_all)['refusal_rate'].iloc[0]
 
 cont_all['delta_pct'] = cont_all['cont_rate'] - global_rate
 cont_all_sorted = cont_all.sort_values('delta_pct', ascending=False)
@@ -254,30 +142,8 @@ st.markdown("""
 - Discontinued cases are correspondingly lower (Caribbean –13.4 pp, North America –12.8 pp, Africa –6.0 pp), indicating Black applicants are far more likely to be outright refused rather than see cases dropped.
 - Allowed rates are only slightly above global in North America (+4.2 pp) and Africa (+0.9 pp) and actually lower in the Caribbean (–2.9 pp).
 """)
-counts = (
-    df
-    .groupby(['continent','LIT Leave Decision Desc'])['LIT Litigation Count']
-    .sum()
-    .reset_index(name='count')
-)
-
-tot = (
-    df
-    .groupby('continent')['LIT Litigation Count']
-    .sum()
-    .reset_index(name='total')
-)
-
-cont = counts.merge(tot, on='continent')
-cont['pct_cont'] = cont['count'] / cont['total'] * 100
-
-glob = (
-    df
-    .groupby('LIT Leave Decision Desc')['LIT Litigation Count']
-    .sum()
-    .reset_index(name='global_count')
-)
-glob['pct_global'] = glob['global_count'] / glob['global_count'].sum() * 100
+cont = outcome_shares(facts, ['continent']).rename(columns={'pct':'pct_cont'})
+glob = outcome_shares(facts).rename(columns={'pct':'pct_global'})
 
 cont = cont.merge(
     glob[['LIT Leave Decision Desc','pct_global']],
@@ -287,12 +153,6 @@ cont['diff'] = cont['pct_cont'] - cont['pct_global']
 
 sel = cont[cont['continent'].isin(['Africa','North America','Caribbean'])]
 
-sel = sel[~sel['LIT Leave Decision Desc'].isin([
-    'Not Started at Leave',
-    'No Leave Required',
-    'Leave Exception'
-])]
-
 fig = px.bar(
     sel,
     x='diff',
@@ -327,35 +187,12 @@ dec_col   = 'LIT Leave Decision Desc'
 count_col = 'LIT Litigation Count'
 keep_conts = ['Africa', 'North America', 'Caribbean']
 
-glob_tot = (
-    df
-    .groupby(year_col)[count_col]
-    .sum()
-    .reset_index(name='global_total')
-)
-glob_dis = (
-    df[df[dec_col]=='Dismissed']
-    .groupby(year_col)[count_col]
-    .sum()
-    .reset_index(name='global_dismissed')
-)
-glob = glob_tot.merge(glob_dis, on=year_col)
-glob['global_rate'] = glob['global_dismissed'] / glob['global_total'] * 100
-
-cont_tot = (
-    df
-    .groupby([year_col, cont_col])[count_col]
-    .sum()
-    .reset_index(name='cont_total')
+glob = rollup(facts, [year_col]).rename(
+    columns={'total':'global_total', 'dismissed':'global_dismissed', 'refusal_rate':'global_rate'}
 )
-cont_dis = (
-    df[df[dec_col]=='Dismissed']
-    .groupby([year_col, cont_col])[count_col]
-    .sum()
-    .reset_index(name='cont_dismissed')
+cont = rollup(facts, [year_col, cont_col]).rename(
+    columns={'total':'cont_total', 'dismissed':'cont_dismissed', 'refusal_rate':'cont_rate'}
 )
-cont = cont_tot.merge(cont_dis, on=[year_col, cont_col], how='left').fillna(0)
-cont['cont_rate'] = cont['cont_dismissed'] / cont['cont_total'] * 100
 
 cmp = (
     cont
@@ -473,10 +310,10 @@ st.markdown("""
 - Africa and North America have more variety (e.g. HC decisions, visa-officer refusals), whereas the Caribbean relies almost entirely on RAD.
 - RAD share peaked during 2020–2021, reflecting pandemic-era backlogs and expedited dismissals.
 """)
-agg = df.groupby(
-    ['continent','LIT Case Type Group Desc','LIT Leave Decision Date - Year'],
-    as_index=False
-)['LIT Litigation Count'].sum()
+agg = (
+    rollup(facts, ['continent','LIT Case Type Group Desc','LIT Leave Decision Date - Year'])
+    .rename(columns={'total':'LIT Litigation Count'})
+)
 
 top5 = (
     agg.groupby(['continent','LIT Case Type Group Desc'])['LIT Litigation Count']
@@ -543,11 +380,9 @@ st.markdown("""
 - In North America, Mexico (50.2 %) and the United States (22.6 %) together account for over 70 % of the region’s cases,
 """)
 for cont in ['Africa', 'North America']:
-    dfc = df[df['continent'] == cont]
     pc = (
-        dfc
-        .groupby('Country of Citizenship', as_index=False)['LIT Litigation Count']
-        .sum()
+        rollup(facts[facts['continent'] == cont], ['Country of Citizenship'])
+        .rename(columns={'total':'LIT Litigation Count'})
         .sort_values('LIT Litigation Count', ascending=False)
         .head(10)
     )
@@ -4,16 +4,22 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.a34_index import A34FilterIndex
+from utils.figure_cache import figure_cache, figure_key
+from utils.data_versions import A34_REFUSED_CSV, data_versions
 
 # Title
 st.title("🍁 A34 Inadmissibility Refused Data Dashboard")
 st.markdown("---")
 
 # Load data
-@st.cache_data
-def load_data():
-    """Load and cache the CSV data"""
-    data_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed", "a34_1_refused_cleaned.csv")
+@st.cache_data(max_entries=1)
+def load_data(version):
+    """Load and cache the CSV data; `version` keys the cache, so a replaced file is reloaded"""
+    data_path = A34_REFUSED_CSV
     try:
         df = pd.read_csv(data_path)
         return df
@@ -21,12 +27,20 @@ def load_data():
         st.error(f"Data file not found at: {data_path}")
         return pd.DataFrame()
 
+@st.cache_resource(max_entries=1)
+def load_filter_index(version):
+    """Build the filter index once per data version and share it across sessions"""
+    return A34FilterIndex(load_data(version))
+
 # Load data
-df = load_data()
+data_version = data_versions.version("a34_refused")
+df = load_data(data_version)
 
 if df.empty:
     st.stop()
 
+filter_index = load_filter_index(data_version)
+
 # Create slope graph function
 def create_resident_slope_graph(data, title_suffix=""):
     """Create a slope graph comparing Permanent vs Temporary residents"""
@@ -99,9 +113,9 @@ with col_f4:
         st.rerun()
 
 # Get unique values for each column
-countries = sorted(df['country'].unique())
-years = sorted(df['year'].unique())
-inadmissibility_grounds = sorted(df['inadmissibility_grounds'].unique())
+countries = filter_index.values('country')
+years = filter_index.values('year')
+inadmissibility_grounds = filter_index.values('inadmissibility_grounds')
 
 # Determine default values based on clear filter state
 countries_default = None if st.session_state.clear_filters else st.session_state.get('selected_countries', None)
@@ -142,17 +156,26 @@ with col_f3:
 
 st.markdown("---")
 
-# Apply filters
-mask = pd.Series([True] * len(df))  # Start with all True
+# Apply filters (intersection of the precomputed row positions of each selection)
+filtered_df = filter_index.filter(df, {
+    'country': selected_countries,
+    'year': selected_years,
+    'inadmissibility_grounds': selected_inadmissibility,
+})
 
-if selected_countries is not None:
-    mask &= df['country'] == selected_countries
-if selected_years is not None:
-    mask &= df['year'] == selected_years
-if selected_inadmissibility is not None:
-    mask &= df['inadmissibility_grounds'] == selected_inadmissibility
+# Figures are reused across reruns and sessions for the same filters and data
+filter_state = {
+    'country': selected_countries,
+    'year': selected_years,
+    'inadmissibility_grounds': selected_inadmissibility,
+}
 
-filtered_df = df[mask]
+def show_figure(name, build):
+    """Display the figure returned by build(), reusing the cached one for the same filters and data"""
+    figure = figure_cache.get_or_build(figure_key("A34_Refused_Data", name, filter_state, data_version), build)
+    if figure is not None:
+        # st.plotly_chart rejects a figure dict with no traces, so pass a Figure to draw empty charts too
+        st.plotly_chart(go.Figure(figure), use_container_width=True)
 
 # Show current filter status
 if not any([selected_countries is not None, selected_years is not None, selected_inadmissibility is not None]):
@@ -206,82 +229,88 @@ if no_filters_selected:
     
     with col1:
         # Total Refusals by Inadmissibility Grounds
-        inadmiss_data = df.groupby('inadmissibility_grounds')['count'].sum().reset_index()
-        inadmiss_data = inadmiss_data.sort_values('count', ascending=False)
+        def build_inadmissibility_grounds():
+            inadmiss_data = df.groupby('inadmissibility_grounds')['count'].sum().reset_index()
+            inadmiss_data = inadmiss_data.sort_values('count', ascending=False)
         
-        fig_inadmiss = px.bar(
-            inadmiss_data,
-            x='inadmissibility_grounds',
-            y='count',
-            title='Total Refusals by Inadmissibility Grounds',
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_inadmiss.update_layout(
-            xaxis_title="Inadmissibility Grounds",
-            yaxis_title="Count",
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_inadmiss, use_container_width=True)
+            fig_inadmiss = px.bar(
+                inadmiss_data,
+                x='inadmissibility_grounds',
+                y='count',
+                title='Total Refusals by Inadmissibility Grounds',
+                color_discrete_sequence=['#1f77b4']
+            )
+            fig_inadmiss.update_layout(
+                xaxis_title="Inadmissibility Grounds",
+                yaxis_title="Count",
+                xaxis_tickangle=-45
+            )
+            return fig_inadmiss
+        show_figure("inadmissibility_grounds", build_inadmissibility_grounds)
     
     with col2:
         # Top 10 Countries by Total Refusals
-        country_counts = df.groupby('country')['count'].sum().sort_values(ascending=False).head(10).reset_index()
+        def build_top_countries():
+            country_counts = df.groupby('country')['count'].sum().sort_values(ascending=False).head(10).reset_index()
         
-        fig_countries = px.bar(
-            country_counts,
-            x='country',
-            y='count',
-            title='Top 10 Countries by Total Refusals',
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_countries.update_layout(
-            xaxis_title="Country",
-            yaxis_title="Count",
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_countries, use_container_width=True)
+            fig_countries = px.bar(
+                country_counts,
+                x='country',
+                y='count',
+                title='Top 10 Countries by Total Refusals',
+                color_discrete_sequence=['#1f77b4']
+            )
+            fig_countries.update_layout(
+                xaxis_title="Country",
+                yaxis_title="Count",
+                xaxis_tickangle=-45
+            )
+            return fig_countries
+        show_figure("top_countries", build_top_countries)
     
     # Total Refusals Per Year
-    yearly_totals = df.groupby('year')['count'].sum().reset_index()
+    def build_yearly_totals():
+        yearly_totals = df.groupby('year')['count'].sum().reset_index()
     
-    fig_yearly = px.line(
-        yearly_totals,
-        x='year',
-        y='count',
-        title='Total Refusals Per Year',
-        markers=True,
-        line_shape='spline'
-    )
-    fig_yearly.update_layout(
-        xaxis_title="Year",
-        yaxis_title="Count"
-    )
-    st.plotly_chart(fig_yearly, use_container_width=True)
+        fig_yearly = px.line(
+            yearly_totals,
+            x='year',
+            y='count',
+            title='Total Refusals Per Year',
+            markers=True,
+            line_shape='spline'
+        )
+        fig_yearly.update_layout(
+            xaxis_title="Year",
+            yaxis_title="Count"
+        )
+        return fig_yearly
+    show_figure("yearly_totals", build_yearly_totals)
     
     # Refusal Trends Over Time by Inadmissibility Types
-    yearly_inadmiss = df.groupby(['year', 'inadmissibility_grounds'])['count'].sum().reset_index()
+    def build_inadmissibility_trends():
+        yearly_inadmiss = df.groupby(['year', 'inadmissibility_grounds'])['count'].sum().reset_index()
     
-    fig_trends = px.line(
-        yearly_inadmiss,
-        x='year',
-        y='count',
-        color='inadmissibility_grounds',
-        title='Refusal Trends Over Time by Inadmissibility Types',
-        markers=True
-    )
-    fig_trends.update_layout(        xaxis_title="Year",
-        yaxis_title="Number of Refusals",
-        legend_title="Inadmissibility Type"
-    )
-    st.plotly_chart(fig_trends, use_container_width=True)
+        fig_trends = px.line(
+            yearly_inadmiss,
+            x='year',
+            y='count',
+            color='inadmissibility_grounds',
+            title='Refusal Trends Over Time by Inadmissibility Types',
+            markers=True
+        )
+        fig_trends.update_layout(        xaxis_title="Year",
+            yaxis_title="Number of Refusals",
+            legend_title="Inadmissibility Type"
+        )
+        return fig_trends
+    show_figure("inadmissibility_trends", build_inadmissibility_trends)
     
     # Slope Graph for Resident Status
     st.subheader("📊 Permanent vs Temporary Residents Comparison")
     
     # Create and display slope graph for all data
-    slope_fig = create_resident_slope_graph(df, " - All Data")
-    if slope_fig:
-        st.plotly_chart(slope_fig, use_container_width=True)
+    show_figure("resident_slope", lambda: create_resident_slope_graph(df, " - All Data"))
 
 else:
     # Filtered visualizations - dynamic based on selected filters
@@ -308,9 +337,7 @@ else:
             
             # Add slope graph for this filtered data
             st.subheader("📊 Permanent vs Temporary Residents Comparison")
-            slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_countries} in {selected_years}")
-            if slope_fig:
-                st.plotly_chart(slope_fig, use_container_width=True)
+            show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_countries} in {selected_years}"))
         else:
             st.warning("No refusals found matching your criteria.")
       # Case 2: Year and Country selected (show inadmissibility grounds)
@@ -325,19 +352,21 @@ else:
             inadmiss_data = inadmiss_data.sort_values('count', ascending=False)
             
             if not inadmiss_data.empty:
-                fig_inadmiss = px.bar(
-                    inadmiss_data,
-                    x='inadmissibility_grounds',
-                    y='count',
-                    title=f'Inadmissibility Grounds for {selected_countries} in {selected_years}',
-                    color_discrete_sequence=['#FF6B6B']
-                )
-                fig_inadmiss.update_layout(
-                    xaxis_title="Inadmissibility Grounds",
-                    yaxis_title="Number of Refusals",
-                    xaxis_tickangle=-45
-                )
-                st.plotly_chart(fig_inadmiss, use_container_width=True)
+                def build_inadmissibility_grounds():
+                    fig_inadmiss = px.bar(
+                        inadmiss_data,
+                        x='inadmissibility_grounds',
+                        y='count',
+                        title=f'Inadmissibility Grounds for {selected_countries} in {selected_years}',
+                        color_discrete_sequence=['#FF6B6B']
+                    )
+                    fig_inadmiss.update_layout(
+                        xaxis_title="Inadmissibility Grounds",
+                        yaxis_title="Number of Refusals",
+                        xaxis_tickangle=-45
+                    )
+                    return fig_inadmiss
+                show_figure("inadmissibility_grounds", build_inadmissibility_grounds)
         
         with col2:
             # Show summary metrics since we only have single selections
@@ -359,9 +388,7 @@ else:
         
         # Add slope graph for resident comparison
         st.subheader("📊 Permanent vs Temporary Residents Comparison")
-        slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_countries} in {selected_years}")
-        if slope_fig:
-            st.plotly_chart(slope_fig, use_container_width=True)
+        show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_countries} in {selected_years}"))
       # Case 3: Year and Inadmissibility selected (show top countries)
     elif year_selected and inadmissibility_selected and not country_selected:
         st.subheader("🌍 Analysis for Selected Year and Inadmissibility Ground")
@@ -374,19 +401,21 @@ else:
             top_countries = country_data.head(10)
             
             if not top_countries.empty:
-                fig_countries = px.bar(
-                    top_countries,
-                    x='country',
-                    y='count',
-                    title=f'Top 10 Countries for {selected_inadmissibility} in {selected_years}',
-                    color_discrete_sequence=['#FF6B6B']
-                )
-                fig_countries.update_layout(
-                    xaxis_title="Country",
-                    yaxis_title="Number of Refusals",
-                    xaxis_tickangle=-45
-                )
-                st.plotly_chart(fig_countries, use_container_width=True)
+                def build_top_countries():
+                    fig_countries = px.bar(
+                        top_countries,
+                        x='country',
+                        y='count',
+                        title=f'Top 10 Countries for {selected_inadmissibility} in {selected_years}',
+                        color_discrete_sequence=['#FF6B6B']
+                    )
+                    fig_countries.update_layout(
+                        xaxis_title="Country",
+                        yaxis_title="Number of Refusals",
+                        xaxis_tickangle=-45
+                    )
+                    return fig_countries
+                show_figure("top_countries", build_top_countries)
         
         with col2:
             # Show summary metrics since we only have single selections
@@ -408,9 +437,7 @@ else:
         
         # Add slope graph for resident comparison
         st.subheader("📊 Permanent vs Temporary Residents Comparison")
-        slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_inadmissibility} in {selected_years}")
-        if slope_fig:
-            st.plotly_chart(slope_fig, use_container_width=True)
+        show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_inadmissibility} in {selected_years}"))
     
     # Case 4: Country and Inadmissibility selected (show yearly trends)
     elif country_selected and inadmissibility_selected and not year_selected:
@@ -419,25 +446,25 @@ else:
         yearly_data = filtered_df.groupby('year')['count'].sum().reset_index()
         
         if not yearly_data.empty:
-            fig_yearly = px.line(
-                yearly_data,
-                x='year',                
-                 y='count',
-                title=f'Refusals Over Time: {selected_countries} - {selected_inadmissibility}',
-                markers=True,
-                line_shape='spline'
-            )
-            fig_yearly.update_layout(
-                xaxis_title="Year",
-                yaxis_title="Number of Refusals"
-            )
-            st.plotly_chart(fig_yearly, use_container_width=True)
+            def build_yearly_totals():
+                fig_yearly = px.line(
+                    yearly_data,
+                    x='year',                
+                     y='count',
+                    title=f'Refusals Over Time: {selected_countries} - {selected_inadmissibility}',
+                    markers=True,
+                    line_shape='spline'
+                )
+                fig_yearly.update_layout(
+                    xaxis_title="Year",
+                    yaxis_title="Number of Refusals"
+                )
+                return fig_yearly
+            show_figure("yearly_totals", build_yearly_totals)
             
             # Add slope graph for resident comparison
             st.subheader("📊 Permanent vs Temporary Residents Comparison")
-            slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_countries} - {selected_inadmissibility}")
-            if slope_fig:
-                st.plotly_chart(slope_fig, use_container_width=True)
+            show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_countries} - {selected_inadmissibility}"))
     
     # Case 5: Only Year selected (show treemap for top countries with inadmissibility grounds)
     elif year_selected and not country_selected and not inadmissibility_selected:
@@ -448,23 +475,23 @@ else:
         treemap_data = filtered_df[filtered_df['country'].isin(top_countries_data.index)]
         
         if not treemap_data.empty and treemap_data['count'].sum() > 0:
-            fig_treemap = px.treemap(
-                treemap_data,
-                path=["country", "inadmissibility_grounds"],
-                values="count",
-                title=f"Top 5 Countries and Inadmissibility Grounds for {selected_years}",
-                color="inadmissibility_grounds",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_treemap.update_traces(textinfo="label+value+percent entry")
-            fig_treemap.update_layout(height=600)
-            st.plotly_chart(fig_treemap, use_container_width=True)
+            def build_top_countries_treemap():
+                fig_treemap = px.treemap(
+                    treemap_data,
+                    path=["country", "inadmissibility_grounds"],
+                    values="count",
+                    title=f"Top 5 Countries and Inadmissibility Grounds for {selected_years}",
+                    color="inadmissibility_grounds",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig_treemap.update_traces(textinfo="label+value+percent entry")
+                fig_treemap.update_layout(height=600)
+                return fig_treemap
+            show_figure("top_countries_treemap", build_top_countries_treemap)
             
             # Add slope graph for resident comparison
             st.subheader("📊 Permanent vs Temporary Residents Comparison")
-            slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_years}")
-            if slope_fig:
-                st.plotly_chart(slope_fig, use_container_width=True)
+            show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_years}"))
       # Case 6: Only Country selected (show multiple analysis)
     elif country_selected and not year_selected and not inadmissibility_selected:
         st.subheader(f"📊 Analysis for {selected_countries}")
@@ -475,58 +502,62 @@ else:
             yearly_data = filtered_df.groupby('year')['count'].sum().reset_index()
             
             if not yearly_data.empty:
-                fig_yearly = px.line(
-                    yearly_data,
-                    x='year',
-                    y='count',
-                    title=f'Refusals Over Time for {selected_countries}',
-                    markers=True,
-                    line_shape='spline'
-                )
-                fig_yearly.update_layout(
-                    xaxis_title="Year",
-                    yaxis_title="Number of Refusals"
-                )
-                st.plotly_chart(fig_yearly, use_container_width=True)
+                def build_yearly_totals():
+                    fig_yearly = px.line(
+                        yearly_data,
+                        x='year',
+                        y='count',
+                        title=f'Refusals Over Time for {selected_countries}',
+                        markers=True,
+                        line_shape='spline'
+                    )
+                    fig_yearly.update_layout(
+                        xaxis_title="Year",
+                        yaxis_title="Number of Refusals"
+                    )
+                    return fig_yearly
+                show_figure("yearly_totals", build_yearly_totals)
         
         with col2:
             # Time series by inadmissibility grounds
             yearly_inadmiss = filtered_df.groupby(['year', 'inadmissibility_grounds'])['count'].sum().reset_index()
             
             if not yearly_inadmiss.empty:
-                fig_trends = px.line(
-                    yearly_inadmiss,
-                    x='year',
-                    y='count',
-                    color='inadmissibility_grounds',
-                    title=f'Inadmissibility Trends for {selected_countries}',
-                    markers=True
-                )
-                fig_trends.update_layout(
-                    xaxis_title="Year",
-                    yaxis_title="Number of Refusals",
-                    legend_title="Inadmissibility Type"
-                )
-                st.plotly_chart(fig_trends, use_container_width=True)
+                def build_inadmissibility_trends():
+                    fig_trends = px.line(
+                        yearly_inadmiss,
+                        x='year',
+                        y='count',
+                        color='inadmissibility_grounds',
+                        title=f'Inadmissibility Trends for {selected_countries}',
+                        markers=True
+                    )
+                    fig_trends.update_layout(
+                        xaxis_title="Year",
+                        yaxis_title="Number of Refusals",
+                        legend_title="Inadmissibility Type"
+                    )
+                    return fig_trends
+                show_figure("inadmissibility_trends", build_inadmissibility_trends)
         
         # Treemap with different colors for inadmissibility grounds
         if not filtered_df.empty and filtered_df['count'].sum() > 0:
-            fig_treemap = px.treemap(
-                filtered_df,
-                path=["country", "inadmissibility_grounds"],
-                values="count",
-                title=f"Inadmissibility Grounds for {selected_countries}",
-                color="inadmissibility_grounds",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_treemap.update_traces(textinfo="label+value+percent entry")
-            fig_treemap.update_layout(height=600)
-            st.plotly_chart(fig_treemap, use_container_width=True)
+            def build_inadmissibility_treemap():
+                fig_treemap = px.treemap(
+                    filtered_df,
+                    path=["country", "inadmissibility_grounds"],
+                    values="count",
+                    title=f"Inadmissibility Grounds for {selected_countries}",
+                    color="inadmissibility_grounds",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig_treemap.update_traces(textinfo="label+value+percent entry")
+                fig_treemap.update_layout(height=600)
+                return fig_treemap
+            show_figure("inadmissibility_treemap", build_inadmissibility_treemap)
           # Add slope graph for resident comparison
         st.subheader("📊 Permanent vs Temporary Residents Comparison")
-        slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_countries}")
-        if slope_fig:
-            st.plotly_chart(slope_fig, use_container_width=True)
+        show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_countries}"))
       # Case 7: Only Inadmissibility selected (show comprehensive analysis)
     elif inadmissibility_selected and not year_selected and not country_selected:
         st.subheader(f"📈 Analysis for {selected_inadmissibility}")
@@ -538,19 +569,21 @@ else:
             yearly_data = filtered_df.groupby('year')['count'].sum().reset_index()
             
             if not yearly_data.empty:
-                fig_yearly = px.line(
-                    yearly_data,
-                    x='year',
-                    y='count',
-                    title=f'{selected_inadmissibility} Over Time',
-                    markers=True,
-                    line_shape='spline'
-                )
-                fig_yearly.update_layout(
-                    xaxis_title="Year",
-                    yaxis_title="Number of Refusals"
-                )
-                st.plotly_chart(fig_yearly, use_container_width=True)
+                def build_yearly_totals():
+                    fig_yearly = px.line(
+                        yearly_data,
+                        x='year',
+                        y='count',
+                        title=f'{selected_inadmissibility} Over Time',
+                        markers=True,
+                        line_shape='spline'
+                    )
+                    fig_yearly.update_layout(
+                        xaxis_title="Year",
+                        yaxis_title="Number of Refusals"
+                    )
+                    return fig_yearly
+                show_figure("yearly_totals", build_yearly_totals)
         
         with col2:
             # Top countries bar chart
@@ -558,19 +591,21 @@ else:
             top_countries = country_data.head(10)
             
             if not top_countries.empty:
-                fig_countries = px.bar(
-                    top_countries,
-                    x='country',
-                    y='count',
-                    title=f'Top 10 Countries for {selected_inadmissibility}',
-                    color_discrete_sequence=['#4ECDC4']
-                )
-                fig_countries.update_layout(
-                    xaxis_title="Country",
-                    yaxis_title="Number of Refusals",
-                    xaxis_tickangle=-45
-                )
-                st.plotly_chart(fig_countries, use_container_width=True)
+                def build_top_countries():
+                    fig_countries = px.bar(
+                        top_countries,
+                        x='country',
+                        y='count',
+                        title=f'Top 10 Countries for {selected_inadmissibility}',
+                        color_discrete_sequence=['#4ECDC4']
+                    )
+                    fig_countries.update_layout(
+                        xaxis_title="Country",
+                        yaxis_title="Number of Refusals",
+                        xaxis_tickangle=-45
+                    )
+                    return fig_countries
+                show_figure("top_countries", build_top_countries)
         
         # Refusal trends over time by country
         yearly_country_data = filtered_df.groupby(['year', 'country'])['count'].sum().reset_index()
@@ -579,26 +614,26 @@ else:
         yearly_country_filtered = yearly_country_data[yearly_country_data['country'].isin(top_countries_for_ground)]
         
         if not yearly_country_filtered.empty:            
-            fig_trends = px.line(
-                yearly_country_filtered,
-                x='year',
-                y='count',
-                color='country',
-                title=f'Refusal Trends Over Time by Country for {selected_inadmissibility}',
-                markers=True
-            )
-            fig_trends.update_layout(
-                xaxis_title="Year",
-                yaxis_title="Number of Refusals",
-                legend_title="Country"
-            )
-            st.plotly_chart(fig_trends, use_container_width=True)
+            def build_country_trends():
+                fig_trends = px.line(
+                    yearly_country_filtered,
+                    x='year',
+                    y='count',
+                    color='country',
+                    title=f'Refusal Trends Over Time by Country for {selected_inadmissibility}',
+                    markers=True
+                )
+                fig_trends.update_layout(
+                    xaxis_title="Year",
+                    yaxis_title="Number of Refusals",
+                    legend_title="Country"
+                )
+                return fig_trends
+            show_figure("country_trends", build_country_trends)
             
             # Add slope graph for resident comparison
             st.subheader("📊 Permanent vs Temporary Residents Comparison")
-            slope_fig = create_resident_slope_graph(filtered_df, f" - {selected_inadmissibility}")
-            if slope_fig:
-                st.plotly_chart(slope_fig, use_container_width=True)
+            show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, f" - {selected_inadmissibility}"))
     
     # Case 8: Only Resident selected or other combinations
     else:
@@ -611,35 +646,37 @@ else:
             # Bar chart by most relevant dimension            if not country_selected:
                 country_data = filtered_df.groupby('country')['count'].sum().reset_index().sort_values('count', ascending=False).head(10)
                 if not country_data.empty:
-                    fig_bar = px.bar(
-                        country_data,
-                        x='country',
-                        y='count',
-                        title='Top 10 Countries',
-                        color_discrete_sequence=['#1f77b4']
-                    )
-                    fig_bar.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig_bar, use_container_width=True)
+                    def build_top_countries():
+                        fig_bar = px.bar(
+                            country_data,
+                            x='country',
+                            y='count',
+                            title='Top 10 Countries',
+                            color_discrete_sequence=['#1f77b4']
+                        )
+                        fig_bar.update_layout(xaxis_tickangle=-45)
+                        return fig_bar
+                    show_figure("top_countries", build_top_countries)
         
         with col2:
             # Yearly trend if not year selected
             if not year_selected:
                 yearly_data = filtered_df.groupby('year')['count'].sum().reset_index()
                 if not yearly_data.empty:                    
-                    fig_yearly = px.line(
-                        yearly_data,
-                        x='year',
-                        y='count',
-                        title='Yearly Trends',
-                        markers=True
-                    )
-                    st.plotly_chart(fig_yearly, use_container_width=True)
+                    def build_yearly_totals():
+                        fig_yearly = px.line(
+                            yearly_data,
+                            x='year',
+                            y='count',
+                            title='Yearly Trends',
+                            markers=True
+                        )
+                        return fig_yearly
+                    show_figure("yearly_totals", build_yearly_totals)
         
         # Add slope graph for resident comparison
         st.subheader("📊 Permanent vs Temporary Residents Comparison")
-        slope_fig = create_resident_slope_graph(filtered_df, " - General Analysis")
-        if slope_fig:
-            st.plotly_chart(slope_fig, use_container_width=True)
+        show_figure("resident_slope", lambda: create_resident_slope_graph(filtered_df, " - General Analysis"))
 
 # Download section
 st.markdown("---")
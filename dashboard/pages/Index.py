@@ -1,4 +1,9 @@
 import streamlit as st
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.figure_cache import figure_cache
 
 st.set_page_config(layout="wide")
 pages = {
@@ -11,3 +16,8 @@ pages = {
 }
 pg = st.navigation(pages)
 pg.run()
+
+# Shared by every session, so the hit rate covers all visitors since the server started
+stats = figure_cache.stats()
+st.caption(f"Figure cache: {stats['entries']} figures ({stats['bytes'] / 2**20:.1f} MiB), "
+           f"hit rate {stats['hit_rate']:.0%} over {stats['hits'] + stats['misses']} lookups")
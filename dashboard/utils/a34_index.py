@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ["country", "year", "inadmissibility_grounds", "resident", "cor_status"]
+
+
+class A34FilterIndex:
+    """
+    Inverted index over the tidy A34 refusals, mapping each distinct value of a
+    filter column to the sorted positions of the rows holding it.
+
+    Applying a set of filters intersects the position arrays of the selected
+    values, starting from the smallest, instead of comparing whole columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The tidy A34 data the index is built over.
+    columns : list of str, optional
+        The columns to index (default is INDEX_COLUMNS).
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list = INDEX_COLUMNS):
+        self.n_rows = len(df)
+        self.positions = {
+            col: {value: np.asarray(rows, dtype=np.intp) for value, rows in df.groupby(col).indices.items()}
+            for col in columns
+        }
+
+    def values(self, column: str) -> list:
+        """Returns the sorted distinct values of an indexed column."""
+        return sorted(self.positions[column])
+
+    def select(self, selections: dict) -> np.ndarray:
+        """
+        Returns the positions of the rows matching every selected value.
+
+        Parameters
+        ----------
+        selections : dict
+            Maps an indexed column to the value to keep. Columns mapped to None are not filtered.
+
+        Returns
+        -------
+        np.ndarray
+            Sorted row positions, suitable for `df.iloc`.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        matches = [
+            self.positions[col].get(value, empty)
+            for col, value in selections.items() if value is not None
+        ]
+        if not matches:
+            return np.arange(self.n_rows)
+
+        matches.sort(key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def filter(self, df: pd.DataFrame, selections: dict) -> pd.DataFrame:
+        """
+        Returns the rows of `df` matching every selected value.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The data the index was built over.
+        selections : dict
+            Maps an indexed column to the value to keep, as in `select`.
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching rows, in their original order and with their original index labels.
+        """
+        if all(value is None for value in selections.values()):
+            return df
+        return df.iloc[self.select(selections)]
@@ -0,0 +1,221 @@
+import os
+
+import pandas as pd
+
+from utils.litigation_cube import CASE_TYPE, COUNT, COUNTRY, DECISION, YEAR
+from utils.litigation_store import LITIGATION_XLSX, build_litigation_parquet, decode_dimensions, load_litigation
+
+CONTINENT = "continent"
+OUTCOMES = ["Allowed", "Discontinued", "Dismissed"]
+MEASURES = ["total", "decided"] + [outcome.lower() for outcome in OUTCOMES]
+FACT_DIMENSIONS = [CONTINENT, COUNTRY, YEAR, CASE_TYPE]
+
+CONTINENT_MAP = {
+    'India': 'Asia', 'Fiji': 'Oceania', 'Russia': 'Asia', 'Republic of Indonesia': 'Asia',
+    'Georgia': 'Asia', 'Nigeria': 'Africa', 'United States of America': 'North America',
+    'Lebanon': 'Asia', 'Croatia': 'Europe', 'Egypt': 'Africa', "People's Republic of China": 'Asia',
+    'Albania': 'Europe', 'Colombia': 'South America', 'Somalia, Democratic Republic of': 'Africa',
+    'Iraq': 'Asia', 'Italy': 'Europe', 'Rwanda': 'Africa',
+    'United Kingdom and Overseas Territories': 'Europe', 'Bulgaria': 'Europe',
+    'Ukraine': 'Europe', 'Kenya': 'Africa', 'Stateless': 'Unspecified', 'Greece': 'Europe',
+    'Syria': 'Asia', 'Jamaica': 'North America', 'Hungary': 'Europe', 'Turkey': 'Asia',
+    'Pakistan': 'Asia', 'Socialist Republic of Vietnam': 'Asia', 'Kazakhstan': 'Asia',
+    'Mexico': 'North America', 'Federal Republic of Cameroon': 'Africa',
+    'Congo, Democratic Republic of the': 'Africa', 'Namibia': 'Africa', 'Iran': 'Asia',
+    'Cambodia': 'Asia', "Korea, People's Democratic Republic of": 'Asia',
+    'Trinidad and Tobago, Republic of': 'North America', 'Peru': 'South America',
+    'Palestinian Authority (Gaza/West Bank)': 'Asia', 'St. Kitts-Nevis': 'North America',
+    'Republic of Ivory Coast': 'Africa', 'Ghana': 'Africa', 'Republic of South Africa': 'Africa',
+    'El Salvador': 'North America', 'Bangladesh': 'Asia', 'Kosovo, Republic of': 'Europe',
+    'Guinea, Republic of': 'Africa', 'Sri Lanka': 'Asia', 'Latvia': 'Europe',
+    'Hong Kong SAR': 'Asia', 'Jordan': 'Asia', 'Slovak Republic': 'Europe', 'Zimbabwe': 'Africa',
+    'St. Lucia': 'North America', 'Honduras': 'North America', 'United Republic of Tanzania': 'Africa',
+    'Nepal': 'Asia', 'St. Vincent and the Grenadines': 'North America', 'Philippines': 'Asia',
+    'Sierra Leone': 'Africa', 'Tunisia': 'Africa', 'Federal Republic of Germany': 'Europe',
+    'Togo, Republic of': 'Africa', 'Spain': 'Europe', 'Malawi': 'Africa', 'France': 'Europe',
+    'Afghanistan': 'Asia', 'Guyana': 'South America', 'Haiti': 'North America', 'Belgium': 'Europe',
+    'Kuwait': 'Asia', 'Eritrea': 'Africa', 'Algeria': 'Africa', 'Uganda': 'Africa',
+    'Democratic Republic of Sudan': 'Africa', 'Gabon Republic': 'Africa',
+    'Korea, Republic of': 'Asia', 'Chad, Republic of': 'Africa', 'Saudi Arabia': 'Asia',
+    'Brazil': 'South America', 'Mauritius': 'Africa', 'Israel': 'Asia', 'Azerbaijan': 'Asia',
+    'Argentina': 'South America', 'Portugal': 'Europe', 'Dominican Republic': 'North America',
+    'Libya': 'Africa', 'Senegal': 'Africa', 'Romania': 'Europe', 'Venezuela': 'South America',
+    'Poland': 'Europe', 'Belarus': 'Europe', 'Panama, Republic of': 'North America',
+    'Gambia': 'Africa', 'Norway': 'Europe', 'Ethiopia': 'Africa', 'Swaziland': 'Africa',
+    'Costa Rica': 'North America', 'Barbados': 'North America', 'Malaysia': 'Asia',
+    'The Netherlands': 'Europe', 'Liberia': 'Africa', 'Taiwan': 'Asia', 'Switzerland': 'Europe',
+    'Mozambique': 'Africa', 'Nicaragua': 'North America', 'Republic of Ireland': 'Europe',
+    'Burkina-Faso': 'Africa', 'Madagascar': 'Africa', 'Ecuador': 'South America',
+    'Morocco': 'Africa', 'Peoples Republic of Benin': 'Africa', 'Burundi': 'Africa',
+    'Chile': 'South America', 'Belize': 'North America', 'Republic of Djibouti': 'Africa',
+    'Mali, Republic of': 'Africa', 'Uzbekistan': 'Asia', 'Montenegro, Republic of': 'Europe',
+    'Mauritania': 'Africa', 'Angola': 'Africa', 'Armenia': 'Asia', 'Moldova': 'Europe',
+    'Yemen, Republic of': 'Asia', 'Bahama Islands, The': 'North America', 'Grenada': 'North America',
+    "Congo, People's Republic of the": 'Africa', 'Sweden': 'Europe', 'Czech Republic': 'Europe',
+    'Guinea-Bissau': 'Africa', 'Kyrgyzstan': 'Asia', 'Antigua and Barbuda': 'North America',
+    'Equatorial Guinea': 'Africa', 'Japan': 'Asia', 'Cuba': 'North America', 'Lesotho': 'Africa',
+    'Bosnia-Hercegovina': 'Europe', 'Serbia, Republic of': 'Europe', 'Guatemala': 'North America',
+    'Austria': 'Europe', 'Vanuatu': 'Oceania', 'Turkmenistan': 'Asia',
+    'Serbia and Montenegro': 'Europe', 'Lithuania': 'Europe',
+    "Mongolia, People's Republic of": 'Asia', 'Republic of the Niger': 'Africa', 'Thailand': 'Asia',
+    'Botswana, Republic of': 'Africa', 'New Zealand': 'Oceania', 'Myanmar (Burma)': 'Asia',
+    'Unspecified': 'Unspecified', 'Bahrain': 'Asia', 'Macedonia': 'Europe', 'Singapore': 'Asia',
+    'United Arab Emirates': 'Asia', 'Surinam': 'South America', 'Bolivia': 'South America',
+    'Uruguay': 'South America', 'Australia': 'Oceania', 'Comoros': 'Africa', 'Paraguay': 'South America',
+    'Zambia': 'Africa', 'Tadjikistan': 'Asia', 'Cyprus': 'Europe', 'Qatar': 'Asia',
+    'Dominica': 'North America', 'Central African Republic': 'Africa', 'Denmark': 'Europe',
+    'Macao SAR': 'Asia', 'South Sudan, Republic Of': 'Africa', 'Estonia': 'Europe',
+    'Bhutan': 'Asia', 'Slovenia': 'Europe', 'Oman': 'Asia', 'Luxembourg': 'Europe',
+    'Solomons, The': 'Oceania', 'Laos': 'Asia', 'Finland': 'Europe', 'Iceland': 'Europe'
+}
+
+CARIBBEAN_COUNTRIES = {
+    'Antigua and Barbuda': 'Caribbean',
+    'Bahamas': 'Caribbean',
+    'Barbados': 'Caribbean',
+    'Cuba': 'Caribbean',
+    'Dominica': 'Caribbean',
+    'Dominican Republic': 'Caribbean',
+    'Grenada': 'Caribbean',
+    'Haiti': 'Caribbean',
+    'Jamaica': 'Caribbean',
+    'Saint Kitts and Nevis': 'Caribbean',
+    'Saint Lucia': 'Caribbean',
+    'Saint Vincent and the Grenadines': 'Caribbean',
+    'Trinidad and Tobago': 'Caribbean',
+    'Puerto Rico': 'Caribbean',
+    'Saint Martin': 'Caribbean',
+    'Montserrat': 'Caribbean',
+    'Anguilla': 'Caribbean',
+    'British Virgin Islands': 'Caribbean',
+    'US Virgin Islands': 'Caribbean',
+    'Cayman Islands': 'Caribbean',
+    'Aruba': 'Caribbean',
+    'Saint Barthelemy': 'Caribbean',
+    'Saint Pierre and Miquelon': 'Caribbean',
+    'Guadeloupe': 'Caribbean',
+    'Martinique': 'Caribbean'
+}
+CONTINENT_MAP.update(CARIBBEAN_COUNTRIES)
+
+
+def normalize_decisions(decisions: pd.Series) -> pd.Series:
+    """Collapses the leave decision variants ('Dismissed - ...', ...) into 'Allowed', 'Discontinued' and 'Dismissed'."""
+    for outcome in OUTCOMES:
+        decisions = decisions.replace(rf'^{outcome}.*', outcome, regex=True)
+    return decisions
+
+
+def build_continent_facts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the litigation rows to one row per continent, country, year and case type.
+
+    Countries missing from `CONTINENT_MAP` keep a missing continent, and rows with
+    missing values are kept, so global totals over the fact table match totals
+    over the raw rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The litigation cases as returned by `load_litigation`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The dimensions of `FACT_DIMENSIONS` and the litigation count summed as 'total'
+        (every case), 'decided' (cases with a leave decision), and 'allowed',
+        'discontinued' and 'dismissed'.
+    """
+    decisions = normalize_decisions(df[DECISION])
+    facts = pd.DataFrame({
+        CONTINENT: df[COUNTRY].map(CONTINENT_MAP),
+        COUNTRY: df[COUNTRY],
+        YEAR: df[YEAR],
+        CASE_TYPE: df[CASE_TYPE],
+        "total": df[COUNT],
+        "decided": df[COUNT].where(decisions.notna(), 0),
+    })
+    for outcome in OUTCOMES:
+        facts[outcome.lower()] = df[COUNT].where(decisions == outcome, 0)
+    return facts.groupby(FACT_DIMENSIONS, dropna=False)[MEASURES].sum().reset_index()
+
+
+def rollup(facts: pd.DataFrame, by: list = None, dropna: bool = True) -> pd.DataFrame:
+    """
+    Sums the fact table's measures by the given dimensions and adds the refusal rate.
+
+    Parameters
+    ----------
+    facts : pd.DataFrame
+        The fact table produced by `build_continent_facts`.
+    by : list of str, optional
+        The dimensions to group by (default is none: one row of global totals).
+    dropna : bool, optional
+        Whether to drop groups with a missing dimension value, e.g. countries without
+        a continent, as `DataFrame.groupby` does (default is True).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group with the dimensions in `by`, the summed measures, and
+        'refusal_rate', the dismissed cases as a percentage of all cases.
+    """
+    if by:
+        totals = facts.groupby(list(by), dropna=dropna)[MEASURES].sum().reset_index()
+    else:
+        totals = facts[MEASURES].sum().to_frame().T
+    totals["refusal_rate"] = totals["dismissed"] / totals["total"] * 100
+    return totals
+
+
+def outcome_shares(facts: pd.DataFrame, by: list = None, dropna: bool = True) -> pd.DataFrame:
+    """
+    Returns each leave outcome as a percentage of the cases per group.
+
+    Parameters
+    ----------
+    facts : pd.DataFrame
+        The fact table produced by `build_continent_facts`.
+    by : list of str, optional
+        The dimensions to group by (default is none: the global shares).
+    dropna : bool, optional
+        Whether to drop groups with a missing dimension value (default is True).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group and outcome with the dimensions in `by`, 'LIT Leave Decision Desc',
+        the outcome's 'count', and 'pct', its share of the group's cases with a leave decision.
+    """
+    totals = rollup(facts, by, dropna)
+    shares = totals.melt(id_vars=list(by or []) + ["decided"], value_vars=[outcome.lower() for outcome in OUTCOMES],
+                         var_name=DECISION, value_name="count")
+    shares[DECISION] = shares[DECISION].str.capitalize()
+    shares["pct"] = shares["count"] / shares["decided"] * 100
+    return shares.drop(columns="decided")
+
+
+def load_continent_facts(path: str = LITIGATION_XLSX) -> pd.DataFrame:
+    """
+    Loads the continent fact table, building and storing it on first use.
+
+    The fact table is stored next to the workbook's Parquet conversion, so it is
+    rebuilt only when the workbook changes.
+
+    Parameters
+    ----------
+    path : str, optional
+        The litigation workbook (default is data/raw/litigation_cases.xlsx).
+
+    Returns
+    -------
+    pd.DataFrame
+        The fact table described in `build_continent_facts`.
+    """
+    facts_path = os.path.splitext(build_litigation_parquet(path))[0] + ".continents.parquet"
+    if not os.path.exists(facts_path):
+        facts = build_continent_facts(load_litigation(path))
+        tmp_path = facts_path + ".tmp"
+        facts.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, facts_path)
+    return decode_dimensions(pd.read_parquet(facts_path))
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+A34_REFUSED_CSV = os.path.join(DATA_DIR, "processed", "a34_1_refused_cleaned.csv")
+LITIGATION_XLSX = os.path.join(DATA_DIR, "raw", "litigation_cases.xlsx")
+
+MISSING = "missing"
+
+
+def file_sha256(path: str) -> str:
+    """
+    Computes the SHA-256 digest of a file's contents.
+
+    Parameters
+    ----------
+    path : str
+        The file to hash.
+
+    Returns
+    -------
+    str
+        The hex digest of the file contents.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class DataVersions:
+    """
+    Registry of the dashboard's data sources and their current versions.
+
+    A source's version is the first 16 hex digits of its content hash. The hash
+    is only recomputed when the file's modification time or size changes, so
+    checking a version on every rerun costs one `os.stat`, and touching a file
+    without changing it keeps its version. Loaders take the version as an
+    argument, so their cached results are keyed by it and a replaced file is
+    picked up on the next rerun without restarting the server.
+
+    Callbacks registered with `on_change` are called with the source name, the
+    old version and the new version the first time a changed version is seen,
+    so caches that are not keyed by the version can drop what depends on it.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self._hashes = {}
+        self._seen = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str) -> None:
+        """Registers the file `path` as the source `name`."""
+        with self._lock:
+            self.sources[name] = path
+
+    def on_change(self, callback) -> None:
+        """Calls `callback(name, old_version, new_version)` whenever a source's version changes."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def fingerprint(self, path: str) -> str:
+        """
+        Returns the SHA-256 digest of a file, rehashing it only when its modification time or size changed.
+
+        Parameters
+        ----------
+        path : str
+            The file.
+
+        Returns
+        -------
+        str
+            The hex digest, or `MISSING` if the file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return MISSING
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = os.path.abspath(path)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = file_sha256(path)
+        with self._lock:
+            self._hashes[key] = (signature, digest)
+        return digest
+
+    def version(self, name: str) -> str:
+        """
+        Returns the current version of a registered source.
+
+        Parameters
+        ----------
+        name : str
+            The source's name (see `sources`).
+
+        Returns
+        -------
+        str
+            A short content hash of the source, or `MISSING` if the file does not exist.
+        """
+        version = self.fingerprint(self.sources[name])[:16]
+        with self._lock:
+            previous = self._seen.get(name)
+            self._seen[name] = version
+            listeners = list(self._listeners) if previous not in (None, version) else []
+        for callback in listeners:
+            callback(name, previous, version)
+        return version
+
+    def versions(self) -> dict:
+        """Returns the current version of every registered source by name."""
+        return {name: self.version(name) for name in list(self.sources)}
+
+
+# Shared by every page and session of the dashboard process
+data_versions = DataVersions()
+data_versions.register("a34_refused", A34_REFUSED_CSV)
+data_versions.register("litigation", LITIGATION_XLSX)
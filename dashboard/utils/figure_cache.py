@@ -0,0 +1,159 @@
+import collections
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from utils.data_versions import data_versions
+
+DEFAULT_MAX_MB = float(os.environ.get("DASHBOARD_FIGURE_CACHE_MB", 64))
+
+
+def _normalize(value):
+    """Converts a filter value to plain JSON types; sets are sorted, lists keep their order."""
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(item) for item in value), key=repr)
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index, pd.Series)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def figure_key(page: str, name: str, filters: dict = None, version: str = "") -> str:
+    """
+    Returns the cache key of a figure.
+
+    Parameters
+    ----------
+    page : str
+        The page drawing the figure.
+    name : str
+        The figure's name within the page.
+    filters : dict, optional
+        The filter state the figure depends on. Values are normalized, so e.g. a
+        tuple and a list with the same items, or numpy and Python integers, give
+        the same key. Lists keep their order, since the order of a selection can
+        change the figure.
+    version : str, optional
+        The version of the data the figure is drawn from (e.g. `data_versions.version("litigation")`).
+
+    Returns
+    -------
+    str
+    """
+    return json.dumps([page, name, _normalize(filters or {}), version], sort_keys=True)
+
+
+class FigureCache:
+    """
+    Least-recently-used cache of serialized Plotly figures, bounded by memory.
+
+    Figures are stored as their JSON, so a hit costs a `json.loads` instead of
+    rebuilding the figure, and cached figures cannot be modified by the caller.
+    Entries are evicted, least recently used first, when the stored JSON exceeds
+    `max_bytes`. The cache is safe to share between sessions.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum total size of the stored JSON (default is DASHBOARD_FIGURE_CACHE_MB,
+        or 64 MiB).
+    """
+
+    def __init__(self, max_bytes: int = int(DEFAULT_MAX_MB * 2**20)):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Returns the cached figure for `key` as a dict, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+        return json.loads(entry[0])
+
+    def put(self, key: str, figure) -> dict:
+        """
+        Stores a figure and returns it as a dict.
+
+        Figures larger than `max_bytes` are returned without being stored.
+        """
+        spec = pio.to_json(figure, validate=False)
+        size = len(spec.encode())
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self._entries[key] = (spec, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self._counts["evictions"] += 1
+        return json.loads(spec)
+
+    def get_or_build(self, key: str, build):
+        """
+        Returns the cached figure for `key`, or builds, stores and returns it.
+
+        Parameters
+        ----------
+        key : str
+            The key from `figure_key`.
+        build : callable
+            Returns the figure, or None when there is nothing to draw (None is not cached).
+
+        Returns
+        -------
+        dict or None
+            The figure as a dict. Wrap it in `go.Figure` before passing it to
+            `st.plotly_chart`, which rejects a dict with no traces.
+        """
+        figure = self.get(key)
+        if figure is None:
+            figure = build()
+            if figure is not None:
+                figure = self.put(key, figure)
+        return figure
+
+    def stats(self) -> dict:
+        """Returns the hits, misses, hit rate, evictions, entries and bytes stored."""
+        with self._lock:
+            stats = dict(self._counts, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def discard_version(self, version: str) -> int:
+        """Removes the figures drawn from data `version` and returns how many were removed."""
+        with self._lock:
+            stale = [key for key in self._entries if json.loads(key)[-1] == version]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Removes every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Shared by every page and session of the dashboard process
+figure_cache = FigureCache()
+# Figures of a replaced data file can never be hit again, so free their memory at once
+data_versions.on_change(lambda name, old, new: figure_cache.discard_version(old))
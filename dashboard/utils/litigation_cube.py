@@ -0,0 +1,155 @@
+import itertools
+import os
+
+import pandas as pd
+
+from utils.litigation_store import LITIGATION_XLSX, build_litigation_parquet, compact_dimensions, decode_dimensions, load_litigation
+
+COUNTRY = "Country of Citizenship"
+CASE_TYPE = "LIT Case Type Group Desc"
+YEAR = "LIT Leave Decision Date - Year"
+OFFICE = "LIT Primary Office Regional Group Desc"
+DECISION = "LIT Leave Decision Desc"
+COUNT = "LIT Litigation Count"
+
+DIMENSIONS = [COUNTRY, CASE_TYPE, YEAR, OFFICE, DECISION]
+
+
+def build_base_cuboid(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the litigation rows to one row per combination of the five dimensions.
+
+    Rows with missing dimension values are kept, so totals over the cuboid
+    match totals over the raw rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The litigation cases as returned by `load_litigation`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The litigation count summed by country, case type, year, regional office and leave decision.
+    """
+    return df.groupby(DIMENSIONS, dropna=False, observed=True)[COUNT].sum().reset_index()
+
+
+class LitigationCube:
+    """
+    Materialized rollups of the litigation count over every subset of the five dimensions.
+
+    Queries are answered from the smallest rollup that still holds every dimension
+    being grouped on or filtered on, instead of re-scanning the raw rows.
+    The rollups keep their dimensions categorical; `query` and `values` return
+    plain values, as the raw rows would give.
+
+    Parameters
+    ----------
+    base : pd.DataFrame
+        The base cuboid produced by `build_base_cuboid`.
+    """
+
+    def __init__(self, base: pd.DataFrame):
+        self.rollups = {frozenset(DIMENSIONS): base}
+        for size in range(len(DIMENSIONS) - 1, 0, -1):
+            for dims in itertools.combinations(DIMENSIONS, size):
+                self.rollups[frozenset(dims)] = (
+                    base.groupby(list(dims), dropna=False, observed=True)[COUNT].sum().reset_index()
+                )
+        self.grand_total = base[COUNT].sum()
+
+    def values(self, dimension: str) -> list:
+        """Returns the sorted distinct non-missing values of a dimension."""
+        return sorted(self.rollups[frozenset([dimension])][dimension].dropna().astype(object).unique())
+
+    def _select(self, dims: set, filters: dict, year_range) -> pd.DataFrame:
+        rollup = self.rollups[frozenset(dims)]
+        mask = pd.Series(True, index=rollup.index)
+        for column, allowed in filters.items():
+            mask &= rollup[column].isin(allowed)
+        if year_range is not None:
+            mask &= (rollup[YEAR] >= year_range[0]) & (rollup[YEAR] <= year_range[1])
+        return rollup[mask]
+
+    def query(self, by: list, filters: dict = None, year_range: tuple = None) -> pd.DataFrame:
+        """
+        Sums the litigation count by the given dimensions over the filtered cases.
+
+        Equivalent to filtering the raw rows and calling
+        `groupby(by)["LIT Litigation Count"].sum().reset_index()`.
+
+        Parameters
+        ----------
+        by : list of str
+            The dimensions to group by.
+        filters : dict, optional
+            Maps a dimension to the values to keep. Dimensions mapped to an empty
+            selection are not filtered.
+        year_range : tuple of int, optional
+            Inclusive (first, last) leave decision years to keep.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per group with the dimensions in `by` and the summed litigation count.
+        """
+        filters = {column: allowed for column, allowed in (filters or {}).items() if len(allowed)}
+        dims = set(by) | set(filters)
+        if year_range is not None:
+            dims.add(YEAR)
+        selected = self._select(dims, filters, year_range)
+        result = selected.groupby(list(by), observed=True)[COUNT].sum().reset_index()
+        # Plain dimension values and 64-bit counts, as grouping the raw rows would give
+        result[COUNT] = result[COUNT].astype("int64")
+        return decode_dimensions(result)
+
+    def total(self, filters: dict = None, year_range: tuple = None):
+        """
+        Sums the litigation count over the filtered cases.
+
+        Parameters
+        ----------
+        filters : dict, optional
+            Maps a dimension to the values to keep, as in `query`.
+        year_range : tuple of int, optional
+            Inclusive (first, last) leave decision years to keep.
+
+        Returns
+        -------
+        int
+            The total litigation count.
+        """
+        filters = {column: allowed for column, allowed in (filters or {}).items() if len(allowed)}
+        dims = set(filters)
+        if year_range is not None:
+            dims.add(YEAR)
+        if not dims:
+            return self.grand_total
+        return self._select(dims, filters, year_range)[COUNT].sum()
+
+
+def load_litigation_cube(path: str = LITIGATION_XLSX) -> LitigationCube:
+    """
+    Loads the litigation cube, building and storing its base cuboid on first use.
+
+    The base cuboid is stored next to the workbook's Parquet conversion, so it is
+    rebuilt only when the workbook changes.
+
+    Parameters
+    ----------
+    path : str, optional
+        The litigation workbook (default is data/raw/litigation_cases.xlsx).
+
+    Returns
+    -------
+    LitigationCube
+        The rollups over country, case type, year, regional office and leave decision.
+    """
+    cube_path = os.path.splitext(build_litigation_parquet(path))[0] + ".cube.parquet"
+    if not os.path.exists(cube_path):
+        base = build_base_cuboid(load_litigation(path))
+        tmp_path = cube_path + ".tmp"
+        base.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cube_path)
+    return LitigationCube(compact_dimensions(pd.read_parquet(cube_path)))
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.data_versions import DATA_DIR, LITIGATION_XLSX, data_versions
+
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_dimensions(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts string columns to categoricals so Parquet stores them dictionary-encoded."""
+    for col in df.select_dtypes(include="object").columns:
+        values = df[col].dropna()
+        if values.map(lambda v: isinstance(v, str)).all():
+            df[col] = df[col].astype("category")
+    return df
+
+
+def decode_dimensions(df: pd.DataFrame) -> pd.DataFrame:
+    """Restores categorical columns to plain object columns, as the pages expect."""
+    for col in df.select_dtypes(include="category").columns:
+        df[col] = df[col].astype(object)
+    return df
+
+
+def compact_dimensions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keeps string columns as categoricals and downcasts integer columns to the smallest integer type.
+
+    Years and litigation counts then take one or two bytes per row instead of
+    eight, and each distinct string is held once per column instead of once per row.
+    """
+    df = _encode_dimensions(df)
+    for col in df.select_dtypes(include="integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def map_categories(values: pd.Series, function) -> pd.Series:
+    """
+    Applies `function` to the categories of a categorical Series, merging categories that map to the same value.
+
+    Only the distinct values are transformed and the rows keep their integer codes,
+    unlike `Series.map` or `Series.replace`, which decode the column to objects.
+
+    Parameters
+    ----------
+    values : pd.Series
+        A categorical Series.
+    function : callable
+        Takes the categories as a Series and returns the new value of each.
+
+    Returns
+    -------
+    pd.Series
+        The mapped values, still categorical.
+    """
+    mapped = pd.Series(function(values.cat.categories.to_series()).values)
+    categories = pd.Index(mapped.dropna().unique())
+    codes = np.append(categories.get_indexer(mapped), -1)
+    return pd.Series(pd.Categorical.from_codes(codes[values.cat.codes], categories),
+                     index=values.index, name=values.name)
+
+
+def memory_savings(df: pd.DataFrame) -> dict:
+    """
+    Compares the memory of a compact frame with that of the same frame decoded to object columns.
+
+    The decoded size is computed from the categories and codes, without decoding:
+    each row of an object column holds a pointer and its own string object, and
+    numbers take eight bytes, as `pd.read_excel` returns them.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A frame returned by `compact_dimensions`.
+
+    Returns
+    -------
+    dict
+        The 'object_bytes', 'compact_bytes' and 'saved_bytes'.
+    """
+    object_bytes = df.index.memory_usage(deep=True)
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            sizes = np.array([sys.getsizeof(value) for value in values.cat.categories] + [sys.getsizeof(np.nan)])
+            object_bytes += 8 * len(values) + int(sizes[values.cat.codes].sum())
+        else:
+            object_bytes += 8 * len(values)
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    return {"object_bytes": int(object_bytes), "compact_bytes": compact_bytes,
+            "saved_bytes": int(object_bytes) - compact_bytes}
+
+
+def litigation_parquet_path(path: str = LITIGATION_XLSX, sheet_name=0,
+                            skiprows: int = 5, skipfooter: int = 7) -> str:
+    """
+    Returns the Parquet cache file for a workbook and set of read options.
+
+    The file name embeds the workbook's content hash, so replacing the workbook
+    points every loader at a new cache file. The hash comes from `data_versions`,
+    so the workbook is only rehashed when its modification time or size changes.
+
+    Parameters
+    ----------
+    path : str, optional
+        The litigation workbook (default is data/raw/litigation_cases.xlsx).
+    sheet_name : str or int, optional
+        The sheet to read (default is the first sheet).
+    skiprows : int, optional
+        Header rows to skip (default is 5).
+    skipfooter : int, optional
+        Footer rows to skip (default is 7).
+
+    Returns
+    -------
+    str
+        The path of the Parquet file for this workbook version.
+    """
+    source_hash = data_versions.fingerprint(path)[:16]
+    options = hashlib.sha256(repr((sheet_name, skiprows, skipfooter)).encode()).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{options}-{source_hash}.parquet")
+
+
+def build_litigation_parquet(path: str = LITIGATION_XLSX, sheet_name=0,
+                             skiprows: int = 5, skipfooter: int = 7) -> str:
+    """
+    Converts the litigation workbook to Parquet, unless this version is already converted.
+
+    String columns are stored as categoricals (dictionary-encoded in Parquet).
+    Cache files left behind by older versions of the same workbook are removed.
+
+    Parameters
+    ----------
+    path : str, optional
+        The litigation workbook (default is data/raw/litigation_cases.xlsx).
+    sheet_name : str or int, optional
+        The sheet to read (default is the first sheet).
+    skiprows : int, optional
+        Header rows to skip (default is 5).
+    skipfooter : int, optional
+        Footer rows to skip (default is 7).
+
+    Returns
+    -------
+    str
+        The path of the Parquet file.
+    """
+    parquet_path = litigation_parquet_path(path, sheet_name, skiprows, skipfooter)
+    if os.path.exists(parquet_path):
+        return parquet_path
+
+    df = pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows, skipfooter=skipfooter)
+    df = _encode_dimensions(df)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+
+    # Drop files derived from earlier versions of the workbook read with the same options
+    current = os.path.splitext(os.path.basename(parquet_path))[0]
+    prefix = current.rsplit("-", 1)[0] + "-"
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name.endswith(".parquet") and not name.startswith(current):
+            os.remove(os.path.join(CACHE_DIR, name))
+
+    return parquet_path
+
+
+def load_litigation(path: str = LITIGATION_XLSX, sheet_name=0,
+                    skiprows: int = 5, skipfooter: int = 7, compact: bool = False) -> pd.DataFrame:
+    """
+    Loads the litigation cases from the Parquet store, converting the workbook on first use.
+
+    Parameters
+    ----------
+    path : str, optional
+        The litigation workbook (default is data/raw/litigation_cases.xlsx).
+    sheet_name : str or int, optional
+        The sheet to read (default is the first sheet).
+    skiprows : int, optional
+        Header rows to skip (default is 5).
+    skipfooter : int, optional
+        Footer rows to skip (default is 7).
+    compact : bool, optional
+        Whether to keep string columns as categoricals and downcast integer columns
+        (see `compact_dimensions`) instead of returning object and 64-bit columns.
+        The memory saved (see `memory_savings`) is logged at INFO level (default is False).
+
+    Returns
+    -------
+    pd.DataFrame
+        The litigation cases, with the same columns and values as `pd.read_excel` would return.
+    """
+    parquet_path = build_litigation_parquet(path, sheet_name, skiprows, skipfooter)
+    df = pd.read_parquet(parquet_path)
+    if not compact:
+        return decode_dimensions(df)
+    df = compact_dimensions(df)
+    savings = memory_savings(df)
+    logger.info("Loaded %d litigation cases in %.1f MiB (%.1f MiB saved over object columns)",
+                len(df), savings["compact_bytes"] / 2**20, savings["saved_bytes"] / 2**20)
+    return df
@@ -0,0 +1,115 @@
+"""
+Warms the dashboard's caches before it accepts traffic.
+
+Each page of the dashboard's navigation (dashboard/pages/Index.py, the entry
+point of `make run`) is run once in this process with its default (unfiltered)
+selections, so the data loads, filter index, litigation cube and default figures
+are in the shared Streamlit and figure caches when the first visitor arrives.
+With --serve, the Streamlit server is then started on Index.py in the same
+process (`make serve`):
+
+    python dashboard/warmup.py --serve --port 8501
+"""
+import argparse
+import logging
+import os
+import runpy
+import sys
+import time
+
+import streamlit.logger
+from streamlit import config
+from streamlit.web import bootstrap
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PAGE = os.path.join(DASHBOARD_DIR, "pages", "Index.py")
+# The pages Index.py navigates to; Index.py itself only runs the selected one
+PAGES = [
+    os.path.join(DASHBOARD_DIR, "pages", "A34_Refused_Data.py"),
+    os.path.join(DASHBOARD_DIR, "pages", "litigation_dashboard.py"),
+    os.path.join(DASHBOARD_DIR, "pages", "litigation_interactive.py"),
+]
+
+sys.path.insert(0, DASHBOARD_DIR)
+from utils.figure_cache import figure_cache
+
+
+def warm_page(path: str) -> float:
+    """
+    Runs a page script once with its default selections.
+
+    The page runs as "__main__", as under `streamlit run`, so its cached functions
+    get the same cache keys as when the server runs it.
+
+    Parameters
+    ----------
+    path : str
+        The page script.
+
+    Returns
+    -------
+    float
+        The time taken, in seconds.
+    """
+    start = time.perf_counter()
+    runpy.run_path(path, run_name="__main__")
+    return time.perf_counter() - start
+
+
+def warmup(pages: list = PAGES) -> dict:
+    """
+    Warms every page, printing the time taken by each and in total, and the figure cache's statistics.
+
+    A page that fails is reported and skipped, so a broken page does not keep
+    the server from starting.
+
+    Parameters
+    ----------
+    pages : list of str, optional
+        The page scripts (default is every page of the dashboard).
+
+    Returns
+    -------
+    dict
+        The seconds taken per page name, with None for pages that failed, and the
+        total under 'total'.
+    """
+    timings = {}
+    start = time.perf_counter()
+    # Reading an option parses the config, which would otherwise reset the log level mid-warmup
+    log_level = config.get_option("logger.level")
+    # Pages run outside a Streamlit session here, which Streamlit warns about on every call
+    streamlit.logger.set_log_level(logging.ERROR)
+    try:
+        for path in pages:
+            name = os.path.splitext(os.path.basename(path))[0]
+            try:
+                timings[name] = warm_page(path)
+                print(f"Warmed {name} in {timings[name]:.2f}s")
+            except Exception as e:
+                timings[name] = None
+                print(f"Could not warm {name}: {e!r}")
+    finally:
+        streamlit.logger.set_log_level(log_level)
+    timings["total"] = time.perf_counter() - start
+    stats = figure_cache.stats()
+    print(f"Warmup took {timings['total']:.2f}s; {stats['entries']} figures cached ({stats['bytes'] / 2**10:.0f} KiB), "
+          f"hit rate {stats['hit_rate']:.0%} over {stats['hits'] + stats['misses']} lookups, "
+          f"{stats['evictions']} evicted")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the dashboard caches, then optionally start the server.")
+    parser.add_argument("--serve", action="store_true", help="Start the Streamlit server after warming up")
+    parser.add_argument("--port", type=int, default=None, help="Port of the server (default: Streamlit's)")
+    args = parser.parse_args()
+
+    # Load the server options before warmup reads the config, as `streamlit run` does
+    flag_options = {"server_port": args.port} if args.port is not None else {}
+    bootstrap.load_config_options(flag_options=flag_options)
+
+    warmup()
+    if args.serve:
+        # The port only opens once the caches are warm
+        bootstrap.run(MAIN_PAGE, False, [], flag_options)
@@ -0,0 +1,59 @@
+"""Processing pipeline for the Federal Court decisions of the canadian-legal-data dataset."""
+
+from fc_pipeline.cache import PromptCache
+from fc_pipeline.categorize import (
+    DEFAULT_MIN_KEYWORD_HITS,
+    RE_patterns,
+    SECTION_PATTERNS,
+    GroundMatcher,
+    categorize_document,
+    confident_ground,
+    extract_numbered_lines,
+)
+from fc_pipeline.checkpoint import run_checkpointed
+from fc_pipeline.extract import (
+    classify_inadmissibility,
+    extract_case_outcomes_from_dataframe,
+    extract_decision_fields_from_dataframe,
+    extract_judges_from_dataframe,
+    extract_locations_from_dataframe,
+)
+from fc_pipeline.filters import (
+    TranslationDedup,
+    filter_immigration_cases,
+    filter_inadmissibility,
+    filter_refugee_cases,
+    immigration_cases,
+    mentions_inadmissibility,
+    normalize_citations,
+    not_refugee_case,
+    remove_translated_cases,
+)
+from fc_pipeline.headers import lookup_city, parse_hearing_city, parse_judges
+from fc_pipeline.ingest import iter_decisions, open_decisions
+from fc_pipeline.instrument import RunReport, count_avoided_model_calls, count_model_calls, current_stage
+from fc_pipeline.llm import (
+    OllamaClient,
+    OllamaError,
+    classify_summary,
+    extract_case_outcome,
+    extract_locations_from_text,
+    extract_names_from_judge_sentence,
+    generate_judge_sentence,
+    generate_summary,
+    get_client,
+    run_ollama,
+)
+from fc_pipeline.manifest import RefreshManifest, refresh
+from fc_pipeline.parallel import TextPool
+from fc_pipeline.pipeline import build_stages, collect, iter_frames, run_ahead, run_pipeline
+from fc_pipeline.scheduler import PromptScheduler
+from fc_pipeline.windows import (
+    TokenLedger,
+    estimate_tokens,
+    fit_lines,
+    header_window,
+    judgment_window,
+    prompt_tokens,
+    reasons_window,
+)
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "llm_prompts.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    """
+    Returns the content address of a prompt sent to a model.
+
+    Every prompt is a stage's template filled with a slice of the decision text,
+    so hashing the model name with the full prompt changes the key whenever the
+    model, the template wording or the input slice changes, and only then.
+
+    Parameters
+    ----------
+    model : str
+        The model name.
+    prompt : str
+        The full prompt text.
+
+    Returns
+    -------
+    str
+        The hex SHA-256 digest of the model and prompt.
+    """
+    return hashlib.sha256(f"{model}\x00{prompt}".encode()).hexdigest()
+
+
+class PromptCache:
+    """
+    On-disk SQLite cache of model responses, addressed by `prompt_key`.
+
+    Hits and misses are counted per instance. Once the stored responses exceed
+    `max_bytes`, the least recently used entries are evicted.
+
+    Parameters
+    ----------
+    path : str, optional
+        The SQLite database file (default is data/cache/llm_prompts.sqlite).
+    max_bytes : int, optional
+        The size above which entries are evicted (default is 512 MiB).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS prompt_cache ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS prompt_cache_last_used ON prompt_cache (last_used)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM prompt_cache").fetchone()[0]
+
+    def get(self, model: str, prompt: str):
+        """
+        Returns the cached response for a prompt, or None on a miss.
+
+        Parameters
+        ----------
+        model : str
+            The model name.
+        prompt : str
+            The full prompt text.
+
+        Returns
+        -------
+        str or None
+            The cached model output.
+        """
+        key = prompt_key(model, prompt)
+        with self._lock:
+            row = self._db.execute("SELECT response FROM prompt_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE prompt_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        """
+        Stores a model response, evicting least recently used entries if over `max_bytes`.
+
+        Parameters
+        ----------
+        model : str
+            The model name.
+        prompt : str
+            The full prompt text.
+        response : str
+            The model output to store.
+        """
+        key = prompt_key(model, prompt)
+        size = len(response.encode()) + len(key)
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM prompt_cache WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, model, response, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, size, time.time()),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Delete the oldest entries until the cache is back under 90% of its cap
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT key, size FROM prompt_cache ORDER BY last_used").fetchall()
+        stale = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            stale.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM prompt_cache WHERE key = ?", stale)
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counts, hit rate, entry count and stored bytes."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM prompt_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._size,
+        }
+
+    def clear(self) -> None:
+        """Deletes every cached response."""
+        with self._lock:
+            self._db.execute("DELETE FROM prompt_cache")
+            self._size = 0
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._db.close()
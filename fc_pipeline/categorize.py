@@ -0,0 +1,430 @@
+import re
+import string
+
+# The regex parser is CPython's private re._parser (the public sre_parse module,
+# deprecated since 3.11, before that). It is only used to find the literals of the
+# patterns below: if it is missing or cannot parse a pattern, that pattern is simply
+# run on every text, so matching never depends on it
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    try:
+        import sre_constants
+        import sre_parse
+    except ImportError:
+        sre_constants = sre_parse = None
+
+# Keyword matches for which a case citing a single IRPA section is classified without the model
+DEFAULT_MIN_KEYWORD_HITS = 3
+
+SECTION_PATTERNS = {
+    'security': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*34\b|\b34\(\d+\)', re.IGNORECASE),
+    'human_rights': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*35\b|\b35\(\d+\)', re.IGNORECASE),
+    'serious_criminality': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*36\(1\)', re.IGNORECASE),
+    'criminality': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*36\(2\)', re.IGNORECASE),
+    'organized_criminality': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*37\b|\b37\(\d+\)', re.IGNORECASE),
+    'health_grounds': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*38\b|\b38\(\d+\)', re.IGNORECASE),
+    'financial_reasons': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*39\b|\b39\(\d+\)', re.IGNORECASE),
+    'misrepresentation': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*40\b|\b40\(\d+\)', re.IGNORECASE),
+    'non_compliance': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*41\b|\b41\(\d+\)', re.IGNORECASE),
+    'inadmissible_family': re.compile(r'\b(?:s(?:ection)?\.?\s*|subsection|paragraphs?)\s*42\b|\b42\(\d+\)', re.IGNORECASE)
+}
+
+RE_patterns = {
+    'security': re.compile(
+        r'\b(espionages?|against canada|canada[’\'‘s]* interests?|subversions?|democratic governments?|terrorisms?|dangers? to security|violences?|endangerments?|memberships?|complicity|reasonable grounds? to believe)\b',
+        re.IGNORECASE
+    ),
+    'human_rights': re.compile(
+        r'\b(human rights?|international rights?|violations?|senior officials?|governments?|regimes?|genocides?|war crimes?|crimes? against humanity|participations?|contributions?|reasonable grounds? to believe|terrorisms?)\b',
+        re.IGNORECASE
+    ),
+    'serious_criminality': re.compile(
+        r'\b(criminal convictions?|foreign convictions?|imprisonments?|10 years|ten years|sentences?|over (6|six) months|serious indictable offences?|commissions?|reasonable grounds? to believe)\b',
+        re.IGNORECASE
+    ),
+    'criminality': re.compile(
+        r'\b(criminal convictions?|foreign convictions?|indictments?|indictable offences?|summary offences?|commissions?)\b',
+        re.IGNORECASE
+    ),
+    'organized_criminality': re.compile(
+        r'\b(memberships?|criminal activities?|organized crimes?|acting in concert|people smuggling|traffickings?|money launderings?|proceeds? of crime|reasonable grounds? to believe)\b',
+        re.IGNORECASE
+    ),
+    'health_grounds': re.compile(
+        r'\b(dangers? to public health|dangers? to public safety|excessive demands? on health services|excessive demands? on social services)\b',
+        re.IGNORECASE
+    ),
+    'financial_reasons': re.compile(
+        r'\b(unable or unwilling to support (oneself|dependents?)|arrangements? for care and support|social assistances?)\b',
+        re.IGNORECASE
+    ),
+    'misrepresentation': re.compile(
+        r'\b(misrepresenting|withholding|material facts?|errors? in administration|non-disclosures?|omissions?|false statements?|false information)\b',
+        re.IGNORECASE
+    ),
+    'non_compliance': re.compile(
+        r'\b(contraventions?|non-compliances?|failures? to comply)\b',
+        re.IGNORECASE
+    ),
+    'inadmissible_family': re.compile(
+        r'\b(inadmissible family members?|accompanying family members?)\b',
+        re.IGNORECASE
+    )
+}
+
+
+def extract_numbered_lines(text):
+    """
+    Extracts the numbered paragraphs of a decision, starting from the line containing "[1]".
+
+    Extraction stops at the first line that starts with neither "[number]" nor a digit.
+
+    Parameters
+    ----------
+    text : str
+
+    Returns
+    -------
+    str
+    """
+    lines = text.splitlines()
+    extracted = []
+    start_extracting = False
+
+    for line in lines:
+        line_strip = line.strip()
+        if not start_extracting:
+            # Start if line contains "[1]" anywhere
+            if "[1]" in line_strip:
+                extracted.append(line)
+                start_extracting = True
+        else:
+            # Continue only if line starts with [number] or number
+            if line_strip.startswith("[") and line_strip[1:line_strip.find("]")].isdigit():
+                extracted.append(line)
+            elif line_strip and line_strip[0].isdigit():
+                extracted.append(line)
+            else:
+                break
+    return "\n".join(extracted)
+
+
+def _required_literals(items):
+    # Returns a set of strings, one of which appears in every match of the parsed
+    # items, preferring the set whose shortest string is longest; None if unknown
+    candidates, run = [], ""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run += chr(av)
+            continue
+        if op is sre_constants.AT:
+            continue
+        if run:
+            candidates.append({run})
+            run = ""
+        child = None
+        if op is sre_constants.SUBPATTERN:
+            child = _required_literals(av[-1])
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            child = None if any(b is None for b in branches) else set().union(*branches)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            child = _required_literals(av[2])
+        if child:
+            candidates.append(child)
+    if run:
+        candidates.append({run})
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: min(map(len, literals)))
+
+
+def pattern_literals(pattern):
+    """
+    Returns the literals of which at least one occurs in any text the pattern matches.
+
+    The literals are as written in the pattern; under `re.IGNORECASE` they occur
+    in the text up to the case-insensitive matching of the pattern.
+
+    Parameters
+    ----------
+    pattern : re.Pattern
+
+    Returns
+    -------
+    list of str or None
+        The literals, or None if the pattern has no required literal or cannot be parsed.
+    """
+    if sre_parse is None:
+        return None
+    try:
+        literals = _required_literals(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+    if literals is None:
+        return None
+    # A literal containing another one in the set is redundant
+    return sorted(literal for literal in literals if not any(other != literal and other in literal for other in literals))
+
+
+def _ignorecase_folds():
+    # Non-ASCII characters that re.IGNORECASE matches to an ASCII letter or digit
+    # (e.g. "İ" and "ı" both match "i"), mapped to that character's lowercase form.
+    # No character outside the Basic Multilingual Plane matches one
+    others = "".join(map(chr, range(0x80, 0xD800))) + "".join(map(chr, range(0xE000, 0x10000)))
+    alphabet = string.ascii_lowercase + string.digits
+    return {
+        char: next(c for c in alphabet if re.fullmatch(c, char, re.IGNORECASE))
+        for char in re.findall(f"[{alphabet}]", others, re.IGNORECASE)
+    }
+
+
+_FOLDS = _ignorecase_folds()
+_FOLD_TABLE = str.maketrans(_FOLDS)
+
+
+def fold_case(text):
+    """
+    Lowercases a text so that every ASCII literal `re.IGNORECASE` matches in it occurs in the result.
+
+    Parameters
+    ----------
+    text : str
+
+    Returns
+    -------
+    str
+    """
+    if any(char in text for char in _FOLDS):
+        text = text.translate(_FOLD_TABLE)
+    return text.lower()
+
+
+def literal_trie(literals):
+    """
+    Returns a regex matching any of the literals, factored into a prefix tree.
+
+    The regex engine tries the branches of an alternation one after the other, so
+    a flat alternation of many literals is slow at every position of a text; in
+    the prefix tree each character of the text is compared once per level.
+    Where a literal is a prefix of another one the longer literal is tried first.
+
+    Parameters
+    ----------
+    literals : iterable of str
+
+    Returns
+    -------
+    str
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def expression(node):
+        branches = [re.escape(char) + expression(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return expression(trie)
+
+
+class GroundMatcher:
+    """
+    Finds the section and keyword patterns matching a text.
+
+    The required literals of every pattern (see `pattern_literals`) are found in
+    one scan of the case-folded text (see `fold_case`), with a single regex whose
+    matches are mapped back to the patterns containing them. Only those patterns,
+    and the ones without a required ASCII literal, are then run, so the results
+    are the same as running every pattern.
+
+    Parameters
+    ----------
+    section_patterns : dict of str to re.Pattern, optional
+        The section patterns, in priority order (default is `SECTION_PATTERNS`).
+    keyword_patterns : dict of str to re.Pattern, optional
+        The keyword patterns (default is `RE_patterns`).
+    """
+
+    def __init__(self, section_patterns=None, keyword_patterns=None):
+        self.section_patterns = SECTION_PATTERNS if section_patterns is None else section_patterns
+        self.keyword_patterns = RE_patterns if keyword_patterns is None else keyword_patterns
+        patterns = list(self.section_patterns.values()) + list(self.keyword_patterns.values())
+        self._sections = list(enumerate(self.section_patterns.items()))
+        self._keywords = list(enumerate(self.keyword_patterns.items(), len(self.section_patterns)))
+
+        self._count = len(patterns)
+        self._unconditional = set()
+        owners = {}
+        for index, pattern in enumerate(patterns):
+            literals = pattern_literals(pattern)
+            if literals is None or not all(literal.isascii() for literal in literals):
+                self._unconditional.add(index)
+                continue
+            for literal in literals:
+                owners.setdefault(literal.lower(), set()).add(index)
+        # The scan reports the longest literal starting at each position, which
+        # contains any shorter literal starting there
+        self._owners = {
+            literal: set().union(*(indices for other, indices in owners.items() if other in literal))
+            for literal in owners
+        }
+        self._scan = re.compile(f"(?=({literal_trie(owners)}))") if owners else None
+
+    def candidates(self, text):
+        """
+        Returns the indices of the patterns that can match the text, sections first.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        set of int
+        """
+        found = set(self._unconditional)
+        if self._scan is None:
+            return found
+        for match in self._scan.finditer(fold_case(text)):
+            found |= self._owners[match.group(1)]
+            if len(found) == self._count:
+                break
+        return found
+
+    @staticmethod
+    def _hits(text, patterns, candidates):
+        for index, (category, pattern) in patterns:
+            if index in candidates and pattern.search(text):
+                yield category
+
+    def match(self, text):
+        """
+        Returns every section and keyword category matching the text.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        tuple of list of str
+            The matching section categories and keyword categories, in pattern order.
+        """
+        candidates = self.candidates(text)
+        sections = list(self._hits(text, self._sections, candidates))
+        return sections, list(self._hits(text, self._keywords, candidates))
+
+    def categorize(self, text):
+        """
+        Classifies extracted text with the rules of `categorize_document`.
+
+        Parameters
+        ----------
+        text : str
+            The numbered lines of a decision.
+
+        Returns
+        -------
+        list of str
+        """
+        candidates = self.candidates(text)
+        for category in self._hits(text, self._sections, candidates):
+            return [category]
+        return list(self._hits(text, self._keywords, candidates)) or ['other']
+
+    def confident_ground(self, text, min_keyword_hits=DEFAULT_MIN_KEYWORD_HITS):
+        """
+        Returns the ground of a text that names exactly one section and repeats its keywords,
+        or None if the text is ambiguous.
+
+        Parameters
+        ----------
+        text : str
+            The numbered lines of a decision.
+        min_keyword_hits : int, optional
+            The number of matches of the section's keyword pattern required (default is 3).
+
+        Returns
+        -------
+        str or None
+        """
+        sections = list(self._hits(text, self._sections, self.candidates(text)))
+        if len(sections) != 1 or sections[0] not in self.keyword_patterns:
+            return None
+        hits = sum(1 for _ in self.keyword_patterns[sections[0]].finditer(text))
+        return sections[0] if hits >= min_keyword_hits else None
+
+
+_matcher = GroundMatcher()
+
+
+def _categorize_per_pattern(extracted_text):
+    # Reference path: every pattern searched separately
+    for category, pattern in SECTION_PATTERNS.items():
+        if re.search(pattern, extracted_text):
+            return [category]
+
+    matched_keywords = [
+        category for category, pattern in RE_patterns.items()
+        if re.search(pattern, extracted_text)
+    ]
+
+    return matched_keywords if matched_keywords else ['other']
+
+
+def categorize_document(text, verify=False):
+    """
+    Extracts relevant numbered lines and classifies a legal document
+    into IRPA inadmissibility grounds.
+
+    Returns:
+    - [single ground] if a section is matched.
+    - [multiple grounds] if matched by keyword.
+    - ['other'] if nothing matches.
+
+    Parameters
+    ----------
+    text : str
+    verify : bool, optional
+        If True, also runs each pattern separately and raises a RuntimeError if
+        the results differ from the `GroundMatcher` ones (default is False).
+
+    Returns
+    -------
+    list of str
+    """
+    extracted_text = extract_numbered_lines(text)
+    grounds = _matcher.categorize(extracted_text)
+
+    if verify:
+        expected = _categorize_per_pattern(extracted_text)
+        if grounds != expected:
+            raise RuntimeError(f"GroundMatcher returned {grounds} but the per-pattern search returned {expected}.")
+    return grounds
+
+
+def confident_ground(extracted_text, min_keyword_hits=DEFAULT_MIN_KEYWORD_HITS):
+    """
+    Returns the inadmissibility ground of numbered lines that cite exactly one IRPA
+    section and match its keywords at least `min_keyword_hits` times, or None.
+
+    Parameters
+    ----------
+    extracted_text : str
+        The numbered lines of a decision, from `extract_numbered_lines`.
+    min_keyword_hits : int, optional
+        The number of keyword matches required (default is 3).
+
+    Returns
+    -------
+    str or None
+    """
+    return _matcher.confident_ground(extracted_text, min_keyword_hits)
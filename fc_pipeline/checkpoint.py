@@ -0,0 +1,84 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def read_parquet_lists(path: str) -> pd.DataFrame:
+    """Reads a Parquet file, returning list cells (e.g. judge names) as lists rather than arrays."""
+    df = pd.read_parquet(path)
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].map(lambda v: v.tolist() if isinstance(v, np.ndarray) else v)
+    return df
+
+
+def run_checkpointed(df: pd.DataFrame, process_chunk, columns: list, journal_dir: str = None,
+                     chunk_size: int = 100) -> pd.DataFrame:
+    """
+    Applies a row-wise extraction to a DataFrame chunk by chunk, journaling each
+    finished chunk so an interrupted run resumes where it stopped.
+
+    Each chunk's results are committed to `journal_dir/part-NNNNN.parquet` with an
+    atomic rename as soon as the chunk finishes. On restart, chunks with a committed
+    part file are read back instead of being processed again.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The rows to process.
+    process_chunk : callable
+        Takes a slice of `df` and returns a DataFrame of result columns with the same index.
+    columns : list of str
+        The result columns returned by `process_chunk`.
+    journal_dir : str, optional
+        The directory of the journal. If None, chunks are processed without being journaled.
+    chunk_size : int, optional
+        The number of rows per chunk (default is 100). A journal can only be resumed
+        with the chunk size and row count it was started with.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of `df` with the result columns added.
+    """
+    if journal_dir is not None:
+        os.makedirs(journal_dir, exist_ok=True)
+        meta_path = os.path.join(journal_dir, "_journal.json")
+        meta = {"rows": len(df), "chunk_size": chunk_size}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    raise ValueError(
+                        f"The journal in {journal_dir} was started with different rows or chunk size; "
+                        "remove it to start over."
+                    )
+        else:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+    results = []
+    for number, start in enumerate(range(0, len(df), chunk_size)):
+        chunk = df.iloc[start:start + chunk_size]
+        part_path = None if journal_dir is None else os.path.join(journal_dir, f"part-{number:05d}.parquet")
+
+        if part_path is not None and os.path.exists(part_path):
+            part = read_parquet_lists(part_path)
+            if not part.index.equals(chunk.index):
+                raise ValueError(f"{part_path} does not match the rows of chunk {number}; remove the journal to start over.")
+            results.append(part)
+            continue
+
+        part = process_chunk(chunk)
+        if part_path is not None:
+            tmp_path = part_path + ".tmp"
+            part.to_parquet(tmp_path)
+            os.replace(tmp_path, part_path)
+        results.append(part)
+        print(f"Chunk {number} committed (rows {start}-{start + len(chunk) - 1}).")
+
+    df = df.copy()
+    combined = pd.concat(results) if results else pd.DataFrame(columns=columns)
+    for col in columns:
+        df[col] = combined[col]
+    return df
@@ -0,0 +1,396 @@
+from concurrent.futures import Future
+
+import pandas as pd
+
+from fc_pipeline.categorize import DEFAULT_MIN_KEYWORD_HITS, confident_ground, extract_numbered_lines
+from fc_pipeline.checkpoint import run_checkpointed
+from fc_pipeline.headers import parse_hearing_city, parse_judges
+from fc_pipeline.instrument import count_avoided_model_calls, count_model_calls, current_stage
+from fc_pipeline.llm import (
+    DEFAULT_MODEL,
+    OllamaClient,
+    classification_prompt,
+    decision_fields_prompt,
+    get_client,
+    judge_names_prompt,
+    judge_sentence_prompt,
+    location_prompt,
+    outcome_prompt,
+    parse_decision_fields,
+    parse_name_list,
+    summary_prompt,
+)
+from fc_pipeline.scheduler import PromptScheduler
+from fc_pipeline.windows import header_window, judgment_window, prompt_tokens, reasons_window
+
+
+def classify_inadmissibility(df: pd.DataFrame, text_column: str = "unofficial_text",
+                             model: str = DEFAULT_MODEL, client: OllamaClient = None,
+                             journal_dir: str = None, chunk_size: int = 100,
+                             min_keyword_hits: int = DEFAULT_MIN_KEYWORD_HITS,
+                             token_budget: int = 1024) -> pd.DataFrame:
+    """
+    Classify each court case by:
+    1. Extracting numbered sections starting from [1].
+    2. Summarizing the leading sections that fit in `token_budget` tokens.
+    3. Feeding the summary into a classification prompt.
+
+    Cases whose numbered lines cite exactly one IRPA section and match that ground's
+    keywords at least `min_keyword_hits` times are classified as "Inadmissibility"
+    without the model; only the others go through steps 2 and 3. The two model calls
+    avoided per such case are counted in the `RunReport` stage being measured.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing court case texts.
+    text_column : str, optional
+        The name of the column containing the court text (default is "unofficial_text").
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client to use (default is the shared client).
+    journal_dir : str, optional
+        Directory where finished chunks are journaled so an interrupted run can resume
+        (default is no journal).
+    chunk_size : int, optional
+        The number of rows sent to the model per chunk (default is 100).
+    min_keyword_hits : int, optional
+        The keyword matches needed to classify a case without the model (default is 3);
+        0 or None sends every case to the model.
+    token_budget : int, optional
+        The maximum estimated tokens of the numbered sections sent to the model (default is 1024).
+
+    Returns
+    -------
+    pandas.DataFrame
+        A DataFrame with an added column 'inadmissibility' containing the raw model output.
+        Rows whose request fails get "model_error".
+    """
+    client = client or get_client()
+
+    def process(chunk):
+        texts = list(chunk[text_column])
+        if min_keyword_hits:
+            local = [confident_ground(extract_numbered_lines(text), min_keyword_hits) is not None for text in texts]
+        else:
+            local = [False] * len(texts)
+        ambiguous = [reasons_window(text, token_budget) for text, decided in zip(texts, local) if not decided]
+
+        outputs = iter(_generate_chained(client, model, "summary", [summary_prompt(text) for text in ambiguous],
+                                         "classification", classification_prompt, on_error="model_error"))
+        count_avoided_model_calls(2 * sum(local))
+        return pd.DataFrame({"inadmissibility": ["Inadmissibility" if decided else next(outputs) for decided in local]},
+                            index=chunk.index)
+
+    return run_checkpointed(df, process, ["inadmissibility"], journal_dir, chunk_size)
+
+
+def _generate(client, model, prompt_kind, prompts, on_error=None):
+    # Every model call goes through here, so the prompt sizes are tallied per kind
+    prompt_tokens.record(prompt_kind, prompts)
+    count_model_calls(len(prompts))
+    if isinstance(client, PromptScheduler):
+        return client.generate_many(prompts, model, on_error=on_error, stage=prompt_kind)
+    return client.generate_many(prompts, model, on_error=on_error)
+
+
+def _generate_chained(client, model, first_kind, prompts, second_kind, follow_up, on_error=None):
+    # Sends each prompt, then follow_up(output) as a second prompt, and returns the
+    # second outputs. A scheduler gets each row's second prompt as soon as its first
+    # answer arrives, instead of after the whole chunk.
+    if not isinstance(client, PromptScheduler):
+        firsts = _generate(client, model, first_kind, prompts, on_error)
+        return _generate(client, model, second_kind, [follow_up(output) for output in firsts], on_error)
+
+    def forward(source, target):
+        if source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    stage = current_stage()
+
+    def chain(first, result):
+        if first.exception() is not None and on_error is None:
+            result.set_exception(first.exception())
+            return
+        try:
+            second = follow_up(on_error if first.exception() is not None else first.result())
+            prompt_tokens.record(second_kind, [second])
+            count_model_calls(1, stage)
+            client.submit(second, model, second_kind).add_done_callback(lambda done: forward(done, result))
+        except Exception as e:
+            result.set_exception(e)
+
+    prompt_tokens.record(first_kind, prompts)
+    count_model_calls(len(prompts))
+    results = []
+    for prompt in prompts:
+        result = Future()
+        client.submit(prompt, model, first_kind).add_done_callback(lambda first, result=result: chain(first, result))
+        results.append(result)
+    outputs = []
+    for result in results:
+        error = result.exception()
+        if error is not None and on_error is None:
+            raise error
+        outputs.append(on_error if error is not None else result.result())
+    return outputs
+
+
+def _judges(client, model, texts):
+    outputs = _generate_chained(client, model, "judge_sentence", [judge_sentence_prompt(text) for text in texts],
+                                "judge_names", judge_names_prompt, on_error="")
+    return [[str(name) for name in parse_name_list(output)] for output in outputs]
+
+
+def _locations(client, model, texts):
+    outputs = _generate(client, model, "location", [location_prompt(text) for text in texts], on_error="")
+    return [output if output else "NA" for output in outputs]
+
+
+def _outcomes(client, model, texts):
+    outputs = _generate(client, model, "outcome", [outcome_prompt(text) for text in texts], on_error="unknown")
+    return [output.lower() for output in outputs]
+
+
+def extract_judges_from_dataframe(df: pd.DataFrame, text_column: str = "unofficial_text",
+                                  model: str = DEFAULT_MODEL, client: OllamaClient = None,
+                                  journal_dir: str = None, chunk_size: int = 100,
+                                  parse_headers: bool = True, token_budget: int = 512) -> pd.DataFrame:
+    """
+    Extract judge names from a DataFrame containing court texts.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing court text data.
+    text_column : str, optional
+        The column name in `df` that contains the court text (default is "unofficial_text").
+    model : str, optional
+        The language model to use for generation and parsing (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client to use (default is the shared client).
+    journal_dir : str, optional
+        Directory where finished chunks are journaled so an interrupted run can resume
+        (default is no journal).
+    chunk_size : int, optional
+        The number of rows sent to the model per chunk (default is 100).
+    parse_headers : bool, optional
+        If True, judges named on the "PRESENT:" line are read with `parse_judges` and only the
+        other cases are sent to the model (default is True).
+    token_budget : int, optional
+        The maximum estimated tokens of the first 30 lines sent to the model (default is 512).
+
+    Returns
+    -------
+    pandas.DataFrame
+        A new DataFrame with an additional 'judges' column containing lists of judge names.
+        Rows whose request fails get [].
+    """
+    client = client or get_client()
+
+    def process(chunk):
+        first_30 = [header_window(text, token_budget) for text in chunk[text_column]]
+        judges = [parse_judges(text) if parse_headers else None for text in first_30]
+        missing = [i for i, names in enumerate(judges) if names is None]
+        for i, names in zip(missing, _judges(client, model, [first_30[i] for i in missing])):
+            judges[i] = names
+        return pd.DataFrame({"judges": judges}, index=chunk.index)
+
+    return run_checkpointed(df, process, ["judges"], journal_dir, chunk_size)
+
+
+def extract_locations_from_dataframe(df: pd.DataFrame, startline: int, endline: int,
+                                     text_column: str = "unofficial_text", model: str = DEFAULT_MODEL,
+                                     client: OllamaClient = None, journal_dir: str = None,
+                                     chunk_size: int = 100, parse_headers: bool = True,
+                                     token_budget: int = 512) -> pd.DataFrame:
+    """
+    Extract city names from a DataFrame containing court texts.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing court text data.
+    startline : int
+        The starting line number of the text to consider.
+    endline : int
+        The ending line number of the text to consider.
+    text_column : str, optional
+        The column in `df` that contains the court text (default is "unofficial_text").
+    model : str, optional
+        The language model to use (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client to use (default is the shared client).
+    journal_dir : str, optional
+        Directory where finished chunks are journaled so an interrupted run can resume
+        (default is no journal).
+    chunk_size : int, optional
+        The number of rows sent to the model per chunk (default is 100).
+    parse_headers : bool, optional
+        If True, cities found by `parse_hearing_city` are used and only the other cases are
+        sent to the model (default is True).
+    token_budget : int, optional
+        The maximum estimated tokens of the lines, and "PLACE OF HEARING" line if any, sent to the model (default is 512).
+
+    Returns
+    -------
+    pandas.DataFrame
+        A copy of the input DataFrame with an additional 'locations' column containing extracted city names.
+        Rows whose request fails get "NA".
+    """
+    client = client or get_client()
+
+    def process(chunk):
+        cities = [parse_hearing_city(text) if parse_headers else None for text in chunk[text_column]]
+        missing = [i for i, city in enumerate(cities) if city is None]
+        slices = [header_window(chunk[text_column].iloc[i], token_budget, startline, endline) for i in missing]
+        for i, city in zip(missing, _locations(client, model, slices)):
+            cities[i] = city
+        return pd.DataFrame({"locations": cities}, index=chunk.index)
+
+    return run_checkpointed(df, process, ["locations"], journal_dir, chunk_size)
+
+
+def extract_case_outcomes_from_dataframe(df: pd.DataFrame, start: int, end: int,
+                                         text_column: str = "unofficial_text", model: str = DEFAULT_MODEL,
+                                         client: OllamaClient = None, journal_dir: str = None,
+                                         chunk_size: int = 100, token_budget: int = 256) -> pd.DataFrame:
+    """
+    Extract the case outcome (single word) from a DataFrame containing court texts.
+
+    The excerpt starts at the judgment (see `judgment_window`); lines `start` to `end`
+    are used for decisions without a judgment marker.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing court text data.
+    start : int
+        The first line of the fallback excerpt.
+    end : int
+        The line after the last line of the fallback excerpt.
+    text_column : str, optional
+        The column name in `df` that contains the court text (default is "unofficial_text").
+    model : str, optional
+        The language model to use (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client to use (default is the shared client).
+    journal_dir : str, optional
+        Directory where finished chunks are journaled so an interrupted run can resume
+        (default is no journal).
+    chunk_size : int, optional
+        The number of rows sent to the model per chunk (default is 100).
+    token_budget : int, optional
+        The maximum estimated tokens of the excerpt sent to the model (default is 256).
+
+    Returns
+    -------
+    pandas.DataFrame
+        A new DataFrame with an additional 'outcome' column containing the extracted outcome word.
+        Rows whose request fails get "unknown".
+    """
+    client = client or get_client()
+
+    def process(chunk):
+        excerpts = [judgment_window(text, token_budget, start, end) for text in chunk[text_column]]
+        return pd.DataFrame({"outcome": _outcomes(client, model, excerpts)}, index=chunk.index)
+
+    return run_checkpointed(df, process, ["outcome"], journal_dir, chunk_size)
+
+
+def extract_decision_fields_from_dataframe(df: pd.DataFrame, header_end: int = 30, tail_start: int = -50,
+                                           tail_end: int = -20, text_column: str = "unofficial_text",
+                                           model: str = DEFAULT_MODEL, client: OllamaClient = None,
+                                           journal_dir: str = None, chunk_size: int = 100,
+                                           parse_headers: bool = True, header_budget: int = 512,
+                                           tail_budget: int = 256) -> pd.DataFrame:
+    """
+    Extract the judges, city and outcome of each court case with one model request per case.
+
+    The opening excerpt (see `header_window`) and the closing excerpt (see `judgment_window`)
+    are sent together in a `decision_fields_prompt`,
+    and the JSON response is checked with `parse_decision_fields`. Only the fields missing
+    or malformed in a response are requested again with the judge, location and outcome
+    prompts used by the single-field functions. Judges and cities read from the decision
+    header take precedence over the model's.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing court text data.
+    header_end : int, optional
+        The line after the last line of the opening excerpt (default is 30).
+    tail_start : int, optional
+        The first line of the closing excerpt when the decision has no judgment marker
+        (default is -50).
+    tail_end : int, optional
+        The line after the last line of that closing excerpt (default is -20).
+    text_column : str, optional
+        The column name in `df` that contains the court text (default is "unofficial_text").
+    model : str, optional
+        The language model to use (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client to use (default is the shared client).
+    journal_dir : str, optional
+        Directory where finished chunks are journaled so an interrupted run can resume
+        (default is no journal).
+    chunk_size : int, optional
+        The number of rows sent to the model per chunk (default is 100).
+    parse_headers : bool, optional
+        If True, the judges and city are first read with `parse_judges` and
+        `parse_hearing_city`; cases where both are found only ask the model for the outcome
+        (default is True).
+    header_budget : int, optional
+        The maximum estimated tokens of the opening excerpt (default is 512).
+    tail_budget : int, optional
+        The maximum estimated tokens of the closing excerpt (default is 256).
+
+    Returns
+    -------
+    pandas.DataFrame
+        A new DataFrame with the additional columns 'judges' (lists of judge names),
+        'locations' (city names, "NA" if none) and 'outcome' (one lowercase word).
+        Fields whose requests fail get [], "NA" and "unknown".
+    """
+    client = client or get_client()
+
+    def process(chunk):
+        headers = [header_window(text, header_budget, 0, header_end) for text in chunk[text_column]]
+        tails = [judgment_window(text, tail_budget, tail_start, tail_end) for text in chunk[text_column]]
+        fields = [{} for _ in headers]
+        if parse_headers:
+            for row, text, header in zip(fields, chunk[text_column], headers):
+                for field, value in (("judges", parse_judges(header)), ("city", parse_hearing_city(text))):
+                    if value is not None:
+                        row[field] = value
+            parsed = sum("judges" in row and "city" in row for row in fields)
+            print(f"Read the judges and city of {parsed} of {len(fields)} cases from their headers.")
+
+        # Cases with both header fields only need the outcome, asked for below
+        ask = [i for i, row in enumerate(fields) if "judges" not in row or "city" not in row]
+        outputs = _generate(client, model, "decision_fields", [decision_fields_prompt(headers[i], tails[i]) for i in ask],
+                            on_error="")
+        for i, output in zip(ask, outputs):
+            fields[i] = {**parse_decision_fields(output), **fields[i]}
+
+        # Fall back to the single-field prompts for the fields that failed validation
+        for field, fallback, excerpts in [
+            ("judges", _judges, headers),
+            ("city", _locations, headers),
+            ("outcome", _outcomes, tails),
+        ]:
+            missing = [i for i, row in enumerate(fields) if field not in row]
+            if missing:
+                for i, value in zip(missing, fallback(client, model, [excerpts[i] for i in missing])):
+                    fields[i][field] = value
+
+        return pd.DataFrame({
+            "judges": [row["judges"] for row in fields],
+            "locations": [row["city"] for row in fields],
+            "outcome": [row["outcome"] for row in fields],
+        }, index=chunk.index)
+
+    return run_checkpointed(df, process, ["judges", "locations", "outcome"], journal_dir, chunk_size)
@@ -0,0 +1,267 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+RE_exclude_refugee = re.compile(
+    r'\b(?:Refugee Protection Division|convention refugees?|persons? in need of protection|refugee claimants?|protected persons?|réfugiés?)\b',
+    re.IGNORECASE
+)
+
+
+COURT_ACRONYMS = ['FC', 'CF']
+
+
+def normalize_citations(citations):
+    """
+    Replaces the court acronym of each citation with 'COURT', so that the English
+    and French citations of a decision become equal.
+
+    Runs as one Arrow regex kernel over the column. Word boundaries are ASCII, which
+    makes no difference for neutral citations such as '2015 FC 123'.
+
+    Parameters
+    ----------
+    citations : pd.Series
+
+    Returns
+    -------
+    pd.Series
+        The normalized citations, with the index of `citations`.
+    """
+    pattern = r'\b(?:' + '|'.join(COURT_ACRONYMS) + r')\b'
+    normalized = pc.replace_substring_regex(
+        pa.array(citations, type=pa.large_string(), from_pandas=True), pattern=pattern, replacement='COURT'
+    )
+    return pd.Series(normalized.to_numpy(zero_copy_only=False), index=citations.index, dtype=object)
+
+
+class TranslationDedup:
+    """
+    Drops decisions in the secondary language whose citation, once normalized,
+    matches a decision in the primary language.
+
+    The normalized primary-language citations are kept in a set that grows as
+    batches are added, and secondary-language rows are probed against it.
+
+    Parameters
+    ----------
+    citation_col : str, optional
+        The name of the column containing case citations. Default is 'citation'.
+    lang_col : str, optional
+        The name of the column containing language information. Default is 'language'.
+    lang_primary : str, optional
+        The language code of the version to keep. Default is 'en'.
+    lang_secondary : str, optional
+        The language code of the translations to remove. Default is 'fr'.
+
+    Attributes
+    ----------
+    primary_citations : set of str
+        The normalized citations seen in the primary language.
+    collapsed : int
+        The number of translations dropped, i.e. the FR/EN pairs collapsed.
+    complete : bool
+        True once every primary-language citation has been added (see `from_batches`).
+    """
+
+    def __init__(self, citation_col='citation', lang_col='language', lang_primary='en', lang_secondary='fr'):
+        self.citation_col = citation_col
+        self.lang_col = lang_col
+        self.lang_primary = lang_primary
+        self.lang_secondary = lang_secondary
+        self.primary_citations = set()
+        self.collapsed = 0
+        self.complete = False
+
+    @classmethod
+    def from_batches(cls, batches, **kwargs):
+        """
+        Builds a complete citation set from a scan of the corpus.
+
+        The scan only needs the citation and language columns, e.g.
+        `iter_decisions(columns=['citation', 'language'])`.
+        """
+        dedup = cls(**kwargs)
+        for batch in batches:
+            dedup.add_primary(batch)
+        dedup.complete = True
+        return dedup
+
+    def add_primary(self, df):
+        """Adds the normalized citations of the primary-language rows of `df`."""
+        primary = df.loc[df[self.lang_col] == self.lang_primary, self.citation_col]
+        self.primary_citations.update(normalize_citations(primary).dropna())
+
+    def drop_translations(self, df):
+        """Returns `df` without the secondary-language rows matching a primary citation."""
+        secondary = (df[self.lang_col] == self.lang_secondary).to_numpy()
+        translated = np.zeros(len(df), dtype=bool)
+        if secondary.any():
+            citations = normalize_citations(df.loc[secondary, self.citation_col])
+            translated[secondary] = [citation in self.primary_citations for citation in citations]
+        self.collapsed += int(translated.sum())
+        return df[~translated]
+
+    def stream(self, batches):
+        """
+        Yields the batches without translations.
+
+        If the citation set is complete, each batch is filtered and passed on as
+        it arrives. Otherwise primary citations are added batch by batch, and
+        secondary-language rows without a match yet are held back until the input
+        is exhausted, since their primary version may come later. Those rows are
+        then yielded last.
+        """
+        held = []
+        for batch in batches:
+            if not self.complete:
+                self.add_primary(batch)
+            batch = self.drop_translations(batch)
+            if not self.complete:
+                secondary = batch[self.lang_col] == self.lang_secondary
+                if secondary.any():
+                    held.append(batch[secondary])
+                    batch = batch[~secondary]
+            if len(batch):
+                yield batch
+
+        if held:
+            rest = self.drop_translations(pd.concat(held))
+            if len(rest):
+                yield rest
+
+
+def remove_translated_cases(df, citation_col='citation', lang_col='language', lang_primary='en', lang_secondary='fr'):
+    """
+    Removes rows in the secondary language (e.g., French) that are translations of cases already
+    present in the primary language (e.g., English), based on normalized court citations.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame containing legal case data.
+    citation_col : str, optional
+        The name of the column containing case citations. Default is 'citation'.
+    lang_col : str, optional
+        The name of the column containing language information. Default is 'language'.
+    lang_primary : str, optional
+        The language code to be considered as the primary version (e.g., 'en'). Default is 'en'.
+    lang_secondary : str, optional
+        The language code to be considered as the translated version to remove (e.g., 'fr'). Default is 'fr'.
+
+    Returns
+    -------
+    pd.DataFrame
+        A filtered DataFrame with translated cases removed when the same case exists in the primary language.
+    """
+    dedup = TranslationDedup(citation_col, lang_col, lang_primary, lang_secondary)
+    dedup.add_primary(df)
+    return dedup.drop_translations(df)
+
+
+def immigration_cases(text):
+    """
+    Checks whether the given text contains references to immigration-related ministries
+    within the first 10 lines.
+
+    This function is typically used to filter legal case documents that mention
+    either "Citizenship and Immigration" or "Citoyenneté et Immigration" early in the text.
+
+    Parameters
+    ----------
+    text : str or None
+        The textual content of a legal case, potentially containing multiple lines.
+
+    Returns
+    -------
+    bool
+        True if either phrase appears in the first 10 lines of the text; False otherwise.
+    """
+    if pd.isna(text):
+        return False
+    lines = text.splitlines()[:10]
+    joined_lines = ' '.join(lines)
+    return (
+        "Citizenship and Immigration" in joined_lines or
+        "Citoyenneté et Immigration" in joined_lines or
+        "MCI" in joined_lines
+    )
+
+
+def not_refugee_case(text):
+    """Returns True unless the text contains a refugee exclusion term (see `RE_exclude_refugee`)."""
+    return text is None or RE_exclude_refugee.search(text) is None
+
+
+def mentions_inadmissibility(text):
+    """Returns True if the text contains 'inadmissible' or 'inadmissibility', ignoring case."""
+    lowered = text.lower()
+    return 'inadmissible' in lowered or 'inadmissibility' in lowered
+
+
+def filter_immigration_cases(df, text_column="unofficial_text", pool=None):
+    """
+    Keeps the rows whose text mentions the immigration ministry (see `immigration_cases`).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    text_column : str
+    pool : TextPool, optional
+        Pool evaluating the rows in parallel (default is to evaluate them in this process).
+
+    Returns
+    -------
+    pd.DataFrame: Filtered DataFrame with only immigration cases
+    """
+    if pool is not None:
+        return df[pool.mask(df[text_column], immigration_cases)]
+    return df[df[text_column].apply(immigration_cases)]
+
+
+def filter_refugee_cases(df, text_column="unofficial_text", pool=None):
+    """
+    Removes rows containing refugee exclusion terms from the DataFrame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    text_column : str
+    pool : TextPool, optional
+        Pool evaluating the rows in parallel (default is to evaluate them in this process).
+
+    Returns
+    -------
+    pd.DataFrame: Filtered DataFrame without refugee-related documents
+    """
+    if pool is not None:
+        mask = pool.mask(df[text_column], not_refugee_case)
+    else:
+        mask = ~df[text_column].str.contains(RE_exclude_refugee, na=False)
+    return df[mask].copy()
+
+
+def filter_inadmissibility(df, text_column="unofficial_text", pool=None):
+    """
+    Filters rows in the DataFrame that contain 'inadmissible' or 'inadmissibility'
+    in the specified text column.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input DataFrame
+    text_column : str
+        Name of the column containing case text
+    pool : TextPool, optional
+        Pool evaluating the rows in parallel (default is to evaluate them in this process).
+
+    Returns
+    -------
+    pd.DataFrame: Filtered DataFrame with only relevant cases
+    """
+    if pool is not None:
+        return df[pool.mask(df[text_column], mentions_inadmissibility)]
+    return df[df[text_column].apply(mentions_inadmissibility)]
@@ -0,0 +1,139 @@
+import re
+import unicodedata
+
+# Cities where the Federal Court sits or has held hearings, by their usual English name
+COURT_CITIES = [
+    "Abbotsford", "Brandon", "Calgary", "Charlottetown", "Chicoutimi", "Corner Brook", "Edmonton",
+    "Fredericton", "Gatineau", "Halifax", "Hamilton", "Iqaluit", "Kamloops", "Kelowna", "Kingston",
+    "Kitchener", "Lethbridge", "London", "Moncton", "Montréal", "Nanaimo", "Ottawa", "Prince George",
+    "Québec", "Red Deer", "Regina", "Rimouski", "Rouyn-Noranda", "Saguenay", "Saint John", "Saskatoon",
+    "Sherbrooke", "St. John's", "Sudbury", "Surrey", "Sydney", "Thunder Bay", "Toronto",
+    "Trois-Rivières", "Vancouver", "Victoria", "Whitehorse", "Windsor", "Winnipeg", "Yellowknife",
+]
+CITY_VARIANTS = {
+    "Québec": ["Quebec City", "Québec City", "Ville de Québec"],
+    "St. John's": ["Saint John's"],
+}
+PROVINCES = [
+    "Ontario", "Quebec", "Québec", "British Columbia", "Colombie-Britannique", "Alberta", "Manitoba",
+    "Saskatchewan", "Nova Scotia", "Nouvelle-Écosse", "New Brunswick", "Nouveau-Brunswick",
+    "Newfoundland and Labrador", "Newfoundland", "Terre-Neuve-et-Labrador", "Prince Edward Island",
+    "Île-du-Prince-Édouard", "Yukon", "Northwest Territories", "Territoires du Nord-Ouest", "Nunavut",
+]
+
+PRESENT_PATTERN = re.compile(
+    r"^\s*(?:(?:PRESENT|PRÉSENTE?|PRESENTE|BEFORE|DEVANT)\s*:|En\s+présence\s+d[eu]\b)\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+PLACE_PATTERN = re.compile(
+    r"^\s*(?:PLACE\s+OF\s+HEARING|LIEU\s+DE\s+L['’]AUDIENCE|PLACE|LIEU)\s*:\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+DATELINE_PATTERN = re.compile(
+    r"^\s*([^\W\d_][^,(\d\n]*?)\s*(?:,|\()\s*(?:" + "|".join(map(re.escape, PROVINCES)) + r")\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+JUDGE_TITLE_PATTERN = re.compile(
+    r"^(?:the\s+honou?rable|l['’]honorable|honou?rable|mr\.?|mrs\.?|ms\.?|madam|madame|monsieur|"
+    r"le|la|chief|associate|deputy|senior|acting|justice|judge|juge|en\s+chef|adjointe?|"
+    r"suppléante?|prothonotary|protonotaire)(?=[\s,.]|$)[\s,.]*",
+    re.IGNORECASE,
+)
+JUDGE_SEPARATOR_PATTERN = re.compile(r"\s+(?:and|et)\s+|\s*[;&]\s*", re.IGNORECASE)
+JUDGE_NAME_PATTERN = re.compile(r"[^\W\d_][\w.'’\- ]*")
+
+
+def normalize_place(name: str) -> str:
+    """
+    Returns the gazetteer key of a place name: casefolded, without accents or
+    punctuation, and with "Saint" shortened to "St".
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    str
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+    name = re.sub(r"[.\-–]", " ", name).replace("’", "'")
+    return re.sub(r"\bsaint\b", "st", " ".join(name.split()))
+
+
+GAZETTEER = {normalize_place(city): city for city in COURT_CITIES}
+GAZETTEER.update({normalize_place(variant): city for city, variants in CITY_VARIANTS.items() for variant in variants})
+
+
+def lookup_city(name: str):
+    """Returns the gazetteer city named by `name`, or None if it is not a known court city."""
+    return GAZETTEER.get(normalize_place(name))
+
+
+def parse_hearing_city(text: str, header_lines: int = 30):
+    """
+    Finds the city where a case was heard from the decision's structured lines.
+
+    The "PLACE OF HEARING:" / "LIEU DE L'AUDIENCE :" entries are tried first, then
+    the "City, Province" or "City (Province)" date lines in the first `header_lines`
+    lines. Only cities in `GAZETTEER` are accepted, so hearings held by videoconference
+    fall through to the date line.
+
+    Parameters
+    ----------
+    text : str
+        The court text.
+    header_lines : int, optional
+        The number of opening lines searched for a date line (default is 30).
+
+    Returns
+    -------
+    str or None
+        The city, or None if no known city was found.
+    """
+    header = "\n".join(text.splitlines()[:header_lines])
+    places = [re.split(r"\s*[,(]", place, maxsplit=1)[0] for place in PLACE_PATTERN.findall(text)]
+    for candidate in places + DATELINE_PATTERN.findall(header):
+        city = lookup_city(candidate)
+        if city is not None:
+            return city
+    return None
+
+
+def _judge_name(text: str):
+    previous = None
+    while text != previous:
+        previous, text = text, JUDGE_TITLE_PATTERN.sub("", text)
+    text = re.sub(r",?\s+J\.?$", "", text).strip(" ,.:")
+    if not JUDGE_NAME_PATTERN.fullmatch(text) or len(text.split()) > 5 or not any(c.isupper() for c in text):
+        return None
+    return text.title() if text.isupper() else text
+
+
+def parse_judges(text: str, header_lines: int = 30):
+    """
+    Finds the presiding judges from the "PRESENT:" / "En présence de" line of a decision.
+
+    Titles such as "The Honourable", "Madam Justice", "Chief Justice", "Associate Judge"
+    or "monsieur le juge" are removed.
+
+    Parameters
+    ----------
+    text : str
+        The court text.
+    header_lines : int, optional
+        The number of opening lines searched (default is 30).
+
+    Returns
+    -------
+    list of str or None
+        The judge names, or None if there is no such line or a name could not be read.
+    """
+    match = PRESENT_PATTERN.search("\n".join(text.splitlines()[:header_lines]))
+    if match is None:
+        return None
+    names = [_judge_name(part) for part in JUDGE_SEPARATOR_PATTERN.split(match.group(1))]
+    if not names or any(name is None for name in names):
+        return None
+    return names
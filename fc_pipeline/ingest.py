@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DATASET_NAME = "refugee-law-lab/canadian-legal-data"
+DATASET_CONFIG = "FC"
+MIN_YEAR = 2014
+
+
+def open_decisions(source: str = None) -> pa.Table:
+    """
+    Opens the Federal Court decisions as a memory-mapped Arrow table.
+
+    No decision text is read into memory until batches of the table are materialized.
+
+    Parameters
+    ----------
+    source : str, optional
+        Where to read the decisions from. None loads the FC split of
+        canadian-legal-data through the Hugging Face cache (set HF_DATASETS_OFFLINE=1
+        to use the cached copy without contacting the Hub). A directory written by
+        `Dataset.save_to_disk` is loaded as is. Any other path or glob is read as
+        Parquet files, such as a local copy of the dataset repository.
+
+    Returns
+    -------
+    pyarrow.Table
+        The decisions, backed by the Arrow files of the dataset cache.
+    """
+    from datasets import load_dataset, load_from_disk
+
+    if source is None:
+        dataset = load_dataset(DATASET_NAME, DATASET_CONFIG, split="train")
+    elif os.path.isdir(source) and os.path.exists(os.path.join(source, "state.json")):
+        dataset = load_from_disk(source)
+    else:
+        dataset = load_dataset("parquet", data_files=source, split="train")
+    return dataset.data.table
+
+
+def iter_decisions(source: str = None, min_year: int = MIN_YEAR, columns: list = None, batch_size: int = 1000):
+    """
+    Yields the decisions from `min_year` onwards as DataFrame batches.
+
+    The year filter is evaluated on the year column alone, so only the text of the
+    kept decisions is copied out of the memory-mapped table. Each batch keeps the
+    decisions' row positions in the dataset as its index, as `to_pandas()` followed
+    by `query` would.
+
+    Parameters
+    ----------
+    source : str, optional
+        Where to read the decisions from (see `open_decisions`).
+    min_year : int, optional
+        The first year kept (default is 2014).
+    columns : list of str, optional
+        The columns to load (default is every column).
+    batch_size : int, optional
+        The number of dataset rows scanned per batch (default is 1000).
+
+    Yields
+    ------
+    pandas.DataFrame
+        The kept decisions of each batch.
+    """
+    table = open_decisions(source)
+    if columns is not None:
+        table = table.select(list(dict.fromkeys(list(columns) + ["year"])))
+
+    offset = 0
+    for batch in table.to_batches(max_chunksize=batch_size):
+        mask = pc.greater_equal(batch.column("year"), min_year)
+        positions = np.flatnonzero(mask.to_numpy(zero_copy_only=False))
+        if len(positions):
+            frame = batch.filter(mask).to_pandas()
+            frame.index = offset + positions
+            if columns is not None and "year" not in columns:
+                frame = frame.drop(columns="year")
+            yield frame
+        offset += batch.num_rows
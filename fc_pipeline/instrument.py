@@ -0,0 +1,235 @@
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+METRICS = ["rows_in", "rows_out", "wall_s", "cpu_s", "bytes_read", "bytes_written", "model_calls",
+           "model_calls_avoided"]
+
+_active = threading.local()
+
+
+def _clock():
+    return time.perf_counter(), time.thread_time()
+
+
+def _set_active(stage):
+    previous = getattr(_active, "stage", None)
+    _active.stage = stage
+    return previous
+
+
+def current_stage():
+    """Returns the (report, stage name) being measured in this thread, or None."""
+    return getattr(_active, "stage", None)
+
+
+def count_model_calls(n: int, stage=None) -> None:
+    """
+    Adds `n` model calls to the stage being measured.
+
+    Parameters
+    ----------
+    n : int
+        The number of prompts sent.
+    stage : tuple, optional
+        The `current_stage()` to charge, for calls made from another thread
+        (default is the stage measured in this thread).
+    """
+    stage = stage or current_stage()
+    if stage is not None:
+        report, name = stage
+        report.record(name, model_calls=n)
+
+
+def count_avoided_model_calls(n: int, stage=None) -> None:
+    """
+    Adds `n` model calls that the stage being measured did without, e.g. cases classified by rule.
+
+    Parameters
+    ----------
+    n : int
+        The number of prompts not sent.
+    stage : tuple, optional
+        The `current_stage()` to charge (default is the stage measured in this thread).
+    """
+    stage = stage or current_stage()
+    if stage is not None:
+        report, name = stage
+        report.record(name, model_calls_avoided=n)
+
+
+class RunReport:
+    """
+    Rows in and out, wall and CPU time, bytes read and written and model calls made and avoided per stage of a run.
+
+    Times are exclusive: a stream stage wrapped with `wrap_stage` is not charged for
+    the time spent producing its input. CPU time is that of the thread running the
+    stage, so work done by worker processes or request threads is not included.
+
+    Parameters
+    ----------
+    name : str
+        The name of the run, e.g. the script.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.stages = {}
+        self.attached = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, **metrics) -> None:
+        """Adds the given metrics (see `METRICS`) to the totals of `stage`."""
+        with self._lock:
+            totals = self.stages.setdefault(stage, dict.fromkeys(METRICS, 0))
+            for metric, value in metrics.items():
+                totals[metric] += value
+
+    def attach(self, name: str, values: dict) -> None:
+        """Attaches run-wide values, e.g. `PromptCache.stats()`, reported under `name`."""
+        with self._lock:
+            self.attached[name] = dict(values)
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, rows_in: int = 0, bytes_read: int = 0):
+        """
+        Measures a block of code as `stage`.
+
+        Yields a dict in which the block can set 'rows_out', 'bytes_read' and
+        'bytes_written'. Model calls counted inside the block are charged to `stage`.
+        """
+        counts = {"rows_out": 0, "bytes_read": bytes_read, "bytes_written": 0}
+        previous = _set_active((self, stage))
+        wall, cpu = _clock()
+        try:
+            yield counts
+        finally:
+            end_wall, end_cpu = _clock()
+            _set_active(previous)
+            self.record(stage, rows_in=rows_in, wall_s=end_wall - wall, cpu_s=end_cpu - cpu, **counts)
+
+    def wrap_source(self, stage: str, batches):
+        """Iterates DataFrame batches, charging their production and in-memory size to `stage`."""
+        self.record(stage)
+        return self._measure_source(stage, batches)
+
+    def _measure_source(self, stage, batches):
+        rows, size, wall, cpu = 0, 0, 0.0, 0.0
+        iterator = iter(batches)
+        try:
+            while True:
+                start_wall, start_cpu = _clock()
+                previous = _set_active((self, stage))
+                try:
+                    batch = next(iterator, None)
+                    if batch is not None:
+                        rows += len(batch)
+                        size += int(batch.memory_usage(deep=True).sum())
+                finally:
+                    _set_active(previous)
+                    end_wall, end_cpu = _clock()
+                    wall += end_wall - start_wall
+                    cpu += end_cpu - start_cpu
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            self.record(stage, rows_out=rows, bytes_read=size, wall_s=wall, cpu_s=cpu)
+
+    def wrap_stage(self, stage: str, function):
+        """
+        Returns the stream stage `function` measured as `stage`.
+
+        The stage is charged for the time spent in it minus the time spent pulling
+        its input batches, and its rows in and out are counted.
+        """
+        self.record(stage)
+
+        def measured(batches):
+            upstream = {"rows": 0, "wall": 0.0, "cpu": 0.0}
+
+            def pull():
+                iterator = iter(batches)
+                while True:
+                    start_wall, start_cpu = _clock()
+                    outer = _set_active(None)
+                    try:
+                        batch = next(iterator, None)
+                    finally:
+                        _set_active(outer)
+                        end_wall, end_cpu = _clock()
+                        upstream["wall"] += end_wall - start_wall
+                        upstream["cpu"] += end_cpu - start_cpu
+                    if batch is None:
+                        return
+                    upstream["rows"] += len(batch)
+                    yield batch
+
+            rows, wall, cpu = 0, 0.0, 0.0
+            output = function(pull())
+            try:
+                while True:
+                    start_wall, start_cpu = _clock()
+                    previous = _set_active((self, stage))
+                    try:
+                        batch = next(output, None)
+                    finally:
+                        _set_active(previous)
+                        end_wall, end_cpu = _clock()
+                        wall += end_wall - start_wall
+                        cpu += end_cpu - start_cpu
+                    if batch is None:
+                        return
+                    rows += len(batch)
+                    yield batch
+            finally:
+                self.record(stage, rows_in=upstream["rows"], rows_out=rows,
+                            wall_s=wall - upstream["wall"], cpu_s=cpu - upstream["cpu"])
+        return measured
+
+    def summary(self) -> pd.DataFrame:
+        """Returns the metrics per stage, in the order the stages were wrapped or first recorded, with the rows per second."""
+        with self._lock:
+            summary = pd.DataFrame.from_dict(self.stages, orient="index", columns=METRICS)
+        summary.index.name = "stage"
+        summary["rows_per_s"] = (summary["rows_out"] / summary["wall_s"].where(summary["wall_s"] > 0)).round(1)
+        return summary.round({"wall_s": 3, "cpu_s": 3})
+
+    def to_dict(self) -> dict:
+        """Returns the report as a JSON-serializable dict."""
+        summary = self.summary().reset_index()
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed_s": round(time.perf_counter() - self._start, 3),
+            "model_calls": int(summary["model_calls"].sum()),
+            "model_calls_avoided": int(summary["model_calls_avoided"].sum()),
+            "stages": json.loads(summary.to_json(orient="records")),
+            **self.attached,
+        }
+
+    def write_json(self, path: str) -> None:
+        """Writes `to_dict()` to a JSON file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self) -> None:
+        """Prints the per-stage table, the elapsed time, the model calls made and avoided and the attached values."""
+        summary = self.summary()
+        print(f"Run report for {self.name} ({time.perf_counter() - self._start:.1f}s):")
+        print(summary.to_string())
+        sent, avoided = summary["model_calls"].sum(), summary["model_calls_avoided"].sum()
+        if sent or avoided:
+            print(f"Model calls: {sent} sent, {avoided} avoided.")
+        for name, values in self.attached.items():
+            print(f"{name}: " + ", ".join(f"{key}={value:.3g}" if isinstance(value, float) else f"{key}={value}"
+                                          for key, value in values.items()))
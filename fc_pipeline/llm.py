@@ -0,0 +1,551 @@
+import ast
+import asyncio
+import http.client
+import json
+import os
+import queue
+import re
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from fc_pipeline.cache import DEFAULT_CACHE_PATH, PromptCache
+
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_MODEL = "llama3"
+
+
+class OllamaError(RuntimeError):
+    """Raised when the model server cannot be reached or returns an error."""
+
+
+class OllamaClient:
+    """
+    Client for a local Ollama server that reuses persistent HTTP connections.
+
+    Each call to `generate` borrows a keep-alive connection from a pool instead of
+    starting an `ollama run` process, so the model stays attached between prompts.
+    `agenerate` runs requests concurrently under an asyncio semaphore bounded by
+    `max_concurrency`. When a `PromptCache` is given, prompts already answered by
+    the same model are served from it without contacting the server.
+
+    Parameters
+    ----------
+    host : str, optional
+        Base URL of the server. Defaults to the OLLAMA_HOST environment variable,
+        then http://localhost:11434.
+    model : str, optional
+        The model used when a call does not name one (default is "llama3").
+    max_concurrency : int, optional
+        The maximum number of requests in flight at once (default is 4).
+    timeout : float, optional
+        Socket timeout in seconds for each request (default is 600).
+    cache : PromptCache, optional
+        The response cache to consult before each request (default is no cache).
+    """
+
+    def __init__(self, host: str = None, model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 4, timeout: float = 600.0, cache: PromptCache = None):
+        host = host or os.environ.get("OLLAMA_HOST", DEFAULT_HOST)
+        if "://" not in host:
+            host = "http://" + host
+        url = urllib.parse.urlsplit(host)
+        self.scheme = url.scheme
+        self.netloc = url.netloc
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self._pool = queue.LifoQueue()
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _post(self, path: str, payload: dict) -> dict:
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+
+        # A pooled connection may have been closed by the server while idle,
+        # so a failure on a reused connection is retried once on a fresh one.
+        for attempt in range(2):
+            try:
+                conn, reused = self._pool.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            try:
+                conn.request("POST", path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise OllamaError(f"Request to {self.netloc}{path} failed: {e}") from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._pool.put(conn)
+            if response.status != 200:
+                raise OllamaError(f"{self.netloc}{path} returned {response.status}: {data[:200]!r}")
+            return json.loads(data)
+
+    def cached(self, prompt: str, model: str = None):
+        """
+        Returns the cached output of a prompt, or None if it is not cached or the client has no cache.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt text.
+        model : str, optional
+            The model to use (default is the client's model).
+
+        Returns
+        -------
+        str or None
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(model or self.model, prompt)
+
+    def request(self, prompt: str, model: str = None) -> str:
+        """Sends one prompt to the server without consulting the cache, caches and returns its stripped response."""
+        model = model or self.model
+        result = self._post("/api/generate", {"model": model, "prompt": prompt, "stream": False})
+        response = result.get("response", "").strip()
+        if self.cache is not None:
+            self.cache.put(model, prompt, response)
+        return response
+
+    def generate(self, prompt: str, model: str = None) -> str:
+        """
+        Sends one prompt to the model and returns its stripped response.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt text.
+        model : str, optional
+            The model to use (default is the client's model).
+
+        Returns
+        -------
+        str
+            The model output.
+        """
+        cached = self.cached(prompt, model)
+        if cached is not None:
+            return cached
+        return self.request(prompt, model)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+            return self._semaphores[loop]
+
+    async def agenerate(self, prompt: str, model: str = None) -> str:
+        """Coroutine version of `generate`, bounded by `max_concurrency` requests in flight."""
+        async with self._semaphore():
+            return await asyncio.to_thread(self.generate, prompt, model)
+
+    async def agenerate_many(self, prompts: list, model: str = None) -> list:
+        """Runs `agenerate` over all prompts concurrently and returns the outputs in order."""
+        return await asyncio.gather(*(self.agenerate(prompt, model) for prompt in prompts))
+
+    def generate_many(self, prompts: list, model: str = None, on_error: str = None) -> list:
+        """
+        Sends several prompts concurrently and returns the outputs in order.
+
+        Usable from plain scripts and from notebooks, where an event loop is already running.
+
+        Parameters
+        ----------
+        prompts : list of str
+            The prompts to send.
+        model : str, optional
+            The model to use (default is the client's model).
+        on_error : str, optional
+            Output to use for a prompt whose request fails. By default the first
+            failure is raised.
+
+        Returns
+        -------
+        list of str
+            The model outputs, in the order of `prompts`.
+        """
+        def generate(prompt):
+            try:
+                return self.generate(prompt, model)
+            except OllamaError as e:
+                if on_error is None:
+                    raise
+                print(f"Model error: {e}")
+                return on_error
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(generate, prompts))
+
+    def close(self) -> None:
+        """Closes every pooled connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_default_client = None
+
+
+def get_client() -> OllamaClient:
+    """
+    Returns the client shared by the module-level prompt functions.
+
+    The shared client caches responses in data/cache/llm_prompts.sqlite, or in the
+    file named by the FC_PIPELINE_CACHE environment variable. Setting
+    FC_PIPELINE_CACHE to an empty string disables the cache.
+    """
+    global _default_client
+    if _default_client is None:
+        cache_path = os.environ.get("FC_PIPELINE_CACHE")
+        cache = None if cache_path == "" else PromptCache(cache_path or DEFAULT_CACHE_PATH)
+        _default_client = OllamaClient(cache=cache)
+    return _default_client
+
+
+def run_ollama(prompt: str, model: str = DEFAULT_MODEL, client: OllamaClient = None) -> str:
+    """
+    Sends a prompt to the model, returning "model_error" instead of raising on failure.
+
+    Parameters
+    ----------
+    prompt : str
+        The prompt text.
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        The model output, or "model_error" if the request failed.
+    """
+    try:
+        return (client or get_client()).generate(prompt, model)
+    except OllamaError as e:
+        print(f"Model error: {e}")
+        return "model_error"
+
+
+def summary_prompt(text: str) -> str:
+    """Builds the prompt asking for a one-sentence case summary."""
+    return f"""
+You are a legal analyst specializing in Canadian immigration law.
+
+Summarize the following court case in one sentence, clearly stating what the case is about.
+
+Case Text:
+{text}
+
+Summary:
+"""
+
+
+def classification_prompt(summary: str) -> str:
+    """Builds the prompt classifying a summary as inadmissibility or not."""
+    return f"""
+You are a Canadian immigration law expert.
+
+Based on the following summary of a legal case, classify whether the case involves 
+a judicial review of an inadmissibility decision under Canadian immigration law.
+
+
+Respond only with one of the following:
+Inadmissibility
+Not Inadmissibility
+
+Summary:
+{summary}
+
+Classification:
+"""
+
+
+def judge_sentence_prompt(text: str) -> str:
+    """Builds the prompt asking for a sentence naming the presiding judges."""
+    return f"""
+You are a legal assistant. Your task is to identify the names of the judge(s) who presided over the case from the following court text.
+
+Instructions:
+- Return a single sentence that starts with "The judges in this case are ..." followed by the judge names.
+- If no judge is mentioned, return "No judges are mentioned in the case."
+- Do not assume any judges if it is not mentioned.
+- Keep your answer in 1 sentence.
+
+Court Text:
+{text}
+"""
+
+
+def judge_names_prompt(sentence: str) -> str:
+    """Builds the prompt extracting judge names as a Python list."""
+    return f"""
+You are a legal parser. Extract only the judge names from the sentence below.
+
+Instructions:
+- Return the names in a valid Python list of strings.
+- Do not include any titles like "Judge", "Justice", or "Chief Justice".
+- If no names are found, return: []
+
+Sentence:
+{sentence}
+
+Output:
+"""
+
+
+def location_prompt(text: str) -> str:
+    """Builds the prompt asking for the city where the case was heard."""
+    return f"""
+You are a legal assistant. Identify the city where the case was heard from the following court text.
+
+Instructions:
+- Extract the city where the case was heard.
+- Just provide the city name, nothing else.
+- If no location is found, return NA
+
+Court Text:
+{text}
+"""
+
+
+def outcome_prompt(text: str) -> str:
+    """Builds the prompt asking for the case outcome in one word."""
+    return f"""
+You are a legal assistant. Your task is to determine the outcome of the court case based on the provided excerpt.
+
+Instructions:
+- Read the text carefully and identify the final decision or outcome.
+- Return only one lowercase word that best summarizes the outcome (e.g., "allowed", "dismissed", etc).
+- If the outcome is unclear or not mentioned, return "unknown".
+
+Court Text:
+{text}
+
+Output:
+"""
+
+
+def decision_fields_prompt(header: str, tail: str) -> str:
+    """Builds the prompt asking for the judges, city and outcome of a case as a JSON object."""
+    return f"""
+You are a legal assistant. From the opening and closing excerpts of a court case below, identify the judge(s) who presided over the case, the city where the case was heard and the outcome of the case.
+
+Instructions:
+- Respond only with a JSON object with the keys "judges", "city" and "outcome".
+- "judges": a list of the judge names as strings, without titles like "Judge", "Justice", or "Chief Justice". Use [] if no judge is mentioned, and do not assume any judges.
+- "city": the city name only. Use "NA" if no location is found.
+- "outcome": one lowercase word that best summarizes the final decision (e.g., "allowed", "dismissed", etc). Use "unknown" if the outcome is unclear or not mentioned.
+
+Opening Excerpt:
+{header}
+
+Closing Excerpt:
+{tail}
+
+JSON:
+"""
+
+
+def parse_decision_fields(output: str) -> dict:
+    """
+    Parses the JSON object in a `decision_fields_prompt` response and keeps the valid fields.
+
+    A valid object has "judges", a list of strings; "city", a non-empty string or null
+    (read as "NA"); and "outcome", a single word (lowercased).
+
+    Parameters
+    ----------
+    output : str
+        The model output.
+
+    Returns
+    -------
+    dict
+        The valid fields among "judges", "city" and "outcome"; missing or malformed
+        fields are left out.
+    """
+    match = re.search(r"\{.*\}", output, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return {}
+
+    fields = {}
+    judges = data.get("judges")
+    if isinstance(judges, list) and all(isinstance(name, str) for name in judges):
+        fields["judges"] = [name.strip() for name in judges if name.strip()]
+    city = data.get("city", "")
+    if city is None or (isinstance(city, str) and city.strip()):
+        fields["city"] = city.strip() if city else "NA"
+    outcome = data.get("outcome")
+    if isinstance(outcome, str) and re.fullmatch(r"[^\W\d_]+", outcome.strip()):
+        fields["outcome"] = outcome.strip().lower()
+    return fields
+
+
+def parse_name_list(output: str) -> list:
+    """Parses the first Python list literal in a model output, or returns []."""
+    match = re.search(r"\[.*?\]", output, re.DOTALL)
+    if match:
+        try:
+            return ast.literal_eval(match.group(0))
+        except Exception:
+            return []
+    return []
+
+
+def generate_summary(text: str, model: str = DEFAULT_MODEL, client: OllamaClient = None) -> str:
+    """
+    Summarizes a court case in one sentence.
+
+    Parameters
+    ----------
+    text : str
+        The court text to summarize.
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        The one-sentence summary.
+    """
+    return run_ollama(summary_prompt(text), model, client)
+
+
+def classify_summary(summary: str, model: str = DEFAULT_MODEL, client: OllamaClient = None) -> str:
+    """
+    Classifies a case summary as "Inadmissibility" or "Not Inadmissibility".
+
+    Parameters
+    ----------
+    summary : str
+        A summary produced by `generate_summary`.
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        The raw classification output from the model.
+    """
+    return run_ollama(classification_prompt(summary), model, client)
+
+
+def generate_judge_sentence(text: str, model: str = DEFAULT_MODEL, client: OllamaClient = None) -> str:
+    """
+    Generate a sentence identifying the judges in a given court text.
+
+    Parameters
+    ----------
+    text : str
+        The court text to analyze.
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        A sentence either listing the judges or stating that none are mentioned.
+    """
+    return (client or get_client()).generate(judge_sentence_prompt(text), model)
+
+
+def extract_names_from_judge_sentence(sentence: str, model: str = DEFAULT_MODEL,
+                                      client: OllamaClient = None) -> list:
+    """
+    Extract only the judge names from a sentence.
+
+    Parameters
+    ----------
+    sentence : str
+        A sentence that mentions the judges (e.g., output of `generate_judge_sentence`).
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    list of str
+        A list of judge names with titles removed. Returns an empty list if no names are found.
+    """
+    return parse_name_list((client or get_client()).generate(judge_names_prompt(sentence), model))
+
+
+def extract_locations_from_text(text: str, model: str = DEFAULT_MODEL, client: OllamaClient = None) -> str:
+    """
+    Directly extracts the city name from the given court text.
+
+    Parameters
+    ----------
+    text : str
+        The court text to analyze.
+    model : str, optional
+        The name of the language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        The extracted city name, or 'NA' if no location is found.
+    """
+    output = (client or get_client()).generate(location_prompt(text), model)
+    return output if output else "NA"
+
+
+def extract_case_outcome(text: str, start: int, end: int, model: str = DEFAULT_MODEL,
+                         client: OllamaClient = None) -> str:
+    """
+    Extract the outcome of a legal case in a single word.
+
+    Parameters
+    ----------
+    text : str
+        The court text from which to extract the outcome.
+    start : int
+        The first line of the excerpt sent to the model.
+    end : int
+        The line after the last line of the excerpt.
+    model : str, optional
+        The language model to use (default is "llama3").
+    client : OllamaClient, optional
+        The client to use (default is the shared client).
+
+    Returns
+    -------
+    str
+        A single word summarizing the case outcome (e.g., "allowed", "dismissed", "granted").
+        Returns "unknown" if no outcome is identified.
+    """
+    lines = text.splitlines()
+    relevant_text = "\n".join(lines[start:end])
+    return (client or get_client()).generate(outcome_prompt(relevant_text), model).lower()
@@ -0,0 +1,244 @@
+import collections
+import hashlib
+import os
+
+import pandas as pd
+
+from fc_pipeline.checkpoint import read_parquet_lists
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "fc_manifest.parquet")
+BOOKKEEPING_COLUMNS = ["text_hash", "model", "completed", "dropped_at"]
+
+
+def text_hash(text) -> str:
+    """Returns the hex SHA-256 digest of a decision text ('' for a missing text)."""
+    if not isinstance(text, str):
+        return ""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class RefreshManifest:
+    """
+    Record of the pipeline stages completed for each decision, keyed by citation.
+
+    A citation appearing more than once in the corpus is keyed as "<citation> #2",
+    "<citation> #3", ... for its later occurrences, in corpus order.
+
+    Each record holds the hash of the decision text and the model it was processed
+    with, the last stage it went through (`completed`), the stage that filtered it
+    out if any (`dropped_at`), and the decision's metadata and stage results
+    without the text.
+
+    Parameters
+    ----------
+    path : str, optional
+        The Parquet file holding the manifest (default is data/cache/fc_manifest.parquet).
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = path
+        if os.path.exists(path):
+            self.records = read_parquet_lists(path)
+        else:
+            self.records = pd.DataFrame(columns=BOOKKEEPING_COLUMNS, index=pd.Index([], name="key"))
+
+    def bookkeeping(self) -> dict:
+        """Returns the bookkeeping columns of each record, by key."""
+        return self.records[BOOKKEEPING_COLUMNS].to_dict("index")
+
+    @staticmethod
+    def start_stage(record: dict, digest: str, model: str, names: list, model_stages, target: int):
+        """
+        Returns the index in `names` of the first stage a decision must go through,
+        or None if its record is up to date through stage `target`.
+
+        The first stage, translation removal, depends on the rest of the corpus and is
+        applied to every decision on every refresh, so the result is at least 1.
+
+        Parameters
+        ----------
+        record : dict or None
+            The decision's entry in `bookkeeping()`, or None for a new decision.
+        digest : str
+            The `text_hash` of the decision's current text.
+        model : str
+            The model the model stages run with.
+        names : list of str
+            The stage names, in order.
+        model_stages : collection of str
+            The names of the stages whose results depend on the model.
+        target : int
+            The index of the last stage to run.
+
+        Returns
+        -------
+        int or None
+        """
+        if record is None:
+            return 1
+        if record["text_hash"] != digest or record["completed"] not in names:
+            return 1
+
+        model_changed = record["model"] != model
+        dropped_at = record["dropped_at"]
+        if isinstance(dropped_at, str):
+            if dropped_at == names[0] or dropped_at not in names:
+                return 1
+            # Being filtered out is final, unless a model did the filtering and the model changed
+            start = names.index(dropped_at) if model_changed and dropped_at in model_stages else None
+        else:
+            start = names.index(record["completed"]) + 1
+            if model_changed:
+                first_model_stage = next((i for i, name in enumerate(names) if name in model_stages), None)
+                if first_model_stage is not None:
+                    start = min(start, first_model_stage)
+            start = max(start, 1)
+
+        return start if start is not None and start <= target else None
+
+    def with_results(self, rows: pd.DataFrame, keys: list) -> pd.DataFrame:
+        """Adds the stored stage results of each decision to rows re-entering the pipeline midway."""
+        stored = self.records.reindex(keys)
+        rows = rows.copy()
+        for col in stored.columns:
+            if col not in rows.columns and col not in BOOKKEEPING_COLUMNS:
+                rows[col] = stored[col].to_numpy()
+        return rows
+
+    def clear(self) -> None:
+        """Forgets every record, so the next refresh reprocesses every decision."""
+        self.records = self.records.iloc[0:0]
+
+    def save(self) -> None:
+        """Writes the manifest, replacing the previous file atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        self.records.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+
+
+def refresh(batches, stages: list, manifest: RefreshManifest, model: str, stop_after: str = None,
+            model_stages=(), text_column: str = "unofficial_text", citation_column: str = "citation") -> pd.DataFrame:
+    """
+    Runs each decision through the stages missing or stale in the manifest, and
+    returns the decisions that passed every stage with their stored and new results.
+
+    Decisions whose text hash and model match their record skip the stages they
+    already completed. New or amended decisions start from the beginning, and records
+    of decisions no longer in the input are removed. `manifest.records` is updated;
+    call `manifest.save()` to keep it.
+
+    Parameters
+    ----------
+    batches : iterable of pandas.DataFrame
+        Every decision of the corpus, e.g. from `iter_decisions`.
+    stages : list of tuple
+        The (name, stage) pairs returned by `build_stages`.
+    manifest : RefreshManifest
+        The manifest of the previous runs.
+    model : str
+        The model the model stages run with.
+    stop_after : str, optional
+        The name of the last stage to run (default is every stage).
+    model_stages : collection of str, optional
+        The names of the stages to re-run when the model changes.
+    text_column : str, optional
+        The column containing the decision text (default is "unofficial_text").
+    citation_column : str, optional
+        The column identifying decisions (default is "citation").
+
+    Returns
+    -------
+    pandas.DataFrame
+        The decisions that passed through stage `stop_after`, without their text.
+    """
+    names = [name for name, _ in stages]
+    if stop_after is not None and stop_after not in names:
+        raise ValueError(f"Unknown stage {stop_after!r}; expected one of {names}.")
+    target = names.index(stop_after) if stop_after is not None else len(names) - 1
+    passed = {name: set() for name in names}
+    meta, keys, digests = [], {}, {}
+    occurrences = collections.Counter()
+    starts, pending = {}, {}
+    previous = manifest.bookkeeping()
+
+    def tap(name, stage):
+        def tapped(stage_batches):
+            for batch in stage(stage_batches):
+                passed[name].update(batch.index)
+                yield batch
+        return tapped
+
+    tapped = [tap(name, stage) for name, stage in stages]
+
+    def scan():
+        for batch in batches:
+            meta.append(batch.drop(columns=text_column))
+            for i, citation in zip(batch.index, batch[citation_column]):
+                occurrences[citation] += 1
+                n = occurrences[citation]
+                keys[i] = citation if n == 1 else f"{citation} #{n}"
+            digests.update(zip(batch.index, batch[text_column].map(text_hash)))
+            yield batch
+
+    def route():
+        # Decisions starting at stage 1 stream on; the few resuming later are held
+        for batch in tapped[0](scan()):
+            start = pd.Series(
+                [manifest.start_stage(previous.get(keys[i]), digests[i], model, names, model_stages, target)
+                 for i in batch.index],
+                index=batch.index, dtype="float",
+            )
+            for k, rows in batch.groupby(start):
+                k = int(k)
+                starts.update(dict.fromkeys(rows.index, k))
+                if k == 1:
+                    yield rows
+                else:
+                    pending.setdefault(k, []).append(manifest.with_results(rows, [keys[i] for i in rows.index]))
+
+    def chain(stage_batches, first):
+        for stage in tapped[first:target + 1]:
+            stage_batches = stage(stage_batches)
+        return stage_batches
+
+    survivors = list(chain(route(), 1))
+    for k in sorted(pending):
+        survivors.extend(chain(iter(pending[k]), k))
+
+    # Rebuild the records in corpus order
+    meta = pd.concat(meta) if meta else pd.DataFrame(columns=[citation_column])
+    records = meta.set_axis(pd.Index([keys[i] for i in meta.index], name="key"))
+    old = manifest.records
+
+    touched = {}
+    for i in meta.index:
+        if i not in passed[names[0]]:
+            touched[keys[i]] = (digests[i], names[0], names[0])
+        elif i in starts:
+            completed, dropped_at = names[target], None
+            for s in range(starts[i], target + 1):
+                if i not in passed[names[s]]:
+                    completed = dropped_at = names[s]
+                    break
+            touched[keys[i]] = (digests[i], completed, dropped_at)
+
+    kept = records.index.difference(pd.Index(list(touched), dtype=object))
+    unchanged = records.loc[kept].join(old.drop(columns=records.columns, errors="ignore"), how="left")
+
+    changed = records.loc[list(touched)].copy()
+    changed["text_hash"] = [digest for digest, _, _ in touched.values()]
+    changed["model"] = model
+    changed["completed"] = [completed for _, completed, _ in touched.values()]
+    changed["dropped_at"] = [dropped_at for _, _, dropped_at in touched.values()]
+    if survivors:
+        results = pd.concat(survivors)
+        results = results.drop(columns=[c for c in results.columns if c in meta.columns or c == text_column])
+        changed = changed.join(results.set_axis(results.index.map(keys)), how="left")
+
+    manifest.records = pd.concat([unchanged, changed]).reindex(records.index)
+    print(f"Refreshed {len(starts)} decisions; {len(kept)} were up to date.")
+
+    done = manifest.records["completed"].map(lambda name: name in names and names.index(name) >= target)
+    output = manifest.records[done & manifest.records["dropped_at"].isna()]
+    return output.drop(columns=BOOKKEEPING_COLUMNS).reset_index(drop=True)
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+def _apply_to_rows(buf, rows: int, data_size: int, start: int, stop: int, predicate) -> np.ndarray:
+    offsets = np.ndarray(rows + 1, dtype=np.int64, buffer=buf)
+    nulls = np.ndarray(rows, dtype=np.bool_, buffer=buf, offset=offsets.nbytes)
+    data = buf[offsets.nbytes + nulls.nbytes:offsets.nbytes + nulls.nbytes + data_size]
+    return np.fromiter(
+        (predicate(None if nulls[i] else str(data[offsets[i]:offsets[i + 1]], "utf-8")) for i in range(start, stop)),
+        dtype=bool,
+        count=stop - start,
+    )
+
+
+def _mask_chunk(name: str, rows: int, data_size: int, start: int, stop: int, predicate) -> np.ndarray:
+    # Worker: attach to the shared texts and evaluate rows start:stop. The views into
+    # the block are released when _apply_to_rows returns, so it can then be closed.
+    shm = shared_memory.SharedMemory(name=name)
+    mask = _apply_to_rows(shm.buf, rows, data_size, start, stop, predicate)
+    shm.close()
+    return mask
+
+
+class TextPool:
+    """
+    Process pool that evaluates row-wise predicates over a text column.
+
+    The texts are copied once into a shared memory block laid out as Arrow string
+    offsets, a null flag per row and the UTF-8 data. Workers receive only the
+    block's name and a row range, so no decision text is pickled. Each worker
+    returns a boolean mask for its rows, and the masks are concatenated in order.
+
+    Parameters
+    ----------
+    workers : int, optional
+        The number of worker processes (default is the number of CPUs).
+    chunks_per_worker : int, optional
+        The number of row ranges queued per worker, to even out uneven text lengths
+        (default is 4).
+    """
+
+    def __init__(self, workers: int = None, chunks_per_worker: int = 4):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self._executor = None
+
+    def mask(self, texts: pd.Series, predicate) -> np.ndarray:
+        """
+        Applies `predicate` to every text and returns the results as a boolean array.
+
+        Parameters
+        ----------
+        texts : pandas.Series
+            The texts. Missing values are passed to the predicate as None.
+        predicate : callable
+            A picklable function of one text returning a bool, such as a module-level function.
+
+        Returns
+        -------
+        numpy.ndarray
+            The predicate results, in the order of `texts`.
+        """
+        rows = len(texts)
+        if rows == 0:
+            return np.zeros(0, dtype=bool)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        array = pa.array(texts, type=pa.large_string(), from_pandas=True)
+        offsets = np.frombuffer(array.buffers()[1], dtype=np.int64, count=rows + 1)
+        nulls = array.is_null().to_numpy(zero_copy_only=False)
+        data_size = int(offsets[-1] - offsets[0])
+
+        shm = shared_memory.SharedMemory(create=True, size=offsets.nbytes + nulls.nbytes + max(data_size, 1))
+        try:
+            np.ndarray(rows + 1, dtype=np.int64, buffer=shm.buf)[:] = offsets - offsets[0]
+            np.ndarray(rows, dtype=np.bool_, buffer=shm.buf, offset=offsets.nbytes)[:] = nulls
+            if data_size:
+                data = np.frombuffer(array.buffers()[2], dtype=np.uint8)
+                np.ndarray(data_size, dtype=np.uint8, buffer=shm.buf,
+                           offset=offsets.nbytes + nulls.nbytes)[:] = data[offsets[0]:offsets[-1]]
+
+            bounds = np.linspace(0, rows, min(rows, self.workers * self.chunks_per_worker) + 1).astype(int)
+            futures = [
+                self._executor.submit(_mask_chunk, shm.name, rows, data_size, start, stop, predicate)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            return np.concatenate([future.result() for future in futures])
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        """Shuts down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,332 @@
+"""
+Runs the Federal Court decisions through the filtering, regex and model stages.
+
+Each stage is a generator that takes an iterable of DataFrame batches and yields
+filtered or annotated batches, so decisions stream from one stage to the next
+without full-text intermediate files. Only the final verification table is written.
+
+The command line keeps a manifest of the stages each decision went through, so a
+run only processes decisions that are new, amended or not yet through every stage,
+and merges them with the stored results of the others.
+
+Usage:
+    python -m fc_pipeline.pipeline [--source PATH] [--output PATH] [--stop-after STAGE] [--journal-dir DIR] [--workers N]
+                                   [--min-keyword-hits N] [--max-in-flight N] [--batch-tokens N]
+                                   [--manifest PATH] [--full-refresh] [--report PATH]
+"""
+import argparse
+import hashlib
+import os
+import queue
+import threading
+from functools import partial
+
+import pandas as pd
+
+from fc_pipeline.categorize import DEFAULT_MIN_KEYWORD_HITS, categorize_document
+from fc_pipeline.extract import (
+    classify_inadmissibility,
+    extract_decision_fields_from_dataframe,
+)
+from fc_pipeline.filters import (
+    TranslationDedup,
+    filter_immigration_cases,
+    filter_inadmissibility,
+    filter_refugee_cases,
+)
+from fc_pipeline.ingest import iter_decisions
+from fc_pipeline.instrument import RunReport
+from fc_pipeline.llm import DEFAULT_MODEL, OllamaClient, get_client
+from fc_pipeline.manifest import DEFAULT_MANIFEST_PATH, RefreshManifest, refresh
+from fc_pipeline.parallel import TextPool
+from fc_pipeline.scheduler import PromptScheduler
+from fc_pipeline.windows import prompt_tokens
+
+TEXT_COLUMN = "unofficial_text"
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "court_cases_verification.xlsx")
+VERIFICATION_DROP_COLUMNS = ["citation2", "name", "scraped_timestamp", TEXT_COLUMN, "other"]
+MODEL_STAGES = ("classify_inadmissibility", "extract_decision_fields")
+
+
+def iter_frames(df: pd.DataFrame, batch_size: int = 1000):
+    """Yields consecutive slices of `df` with at most `batch_size` rows."""
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def map_stage(transform):
+    """
+    Turns a DataFrame-to-DataFrame function into a stage.
+
+    Batches left empty by the transform are not passed downstream.
+    """
+    def stage(batches):
+        for batch in batches:
+            batch = transform(batch)
+            if len(batch):
+                yield batch
+    return stage
+
+
+def add_inadmissibility_ground(df: pd.DataFrame, text_column: str = TEXT_COLUMN, verify: bool = False) -> pd.DataFrame:
+    """Adds the 'inadmissibility_ground' column assigned by `categorize_document`."""
+    df = df.copy()
+    df["inadmissibility_ground"] = df[text_column].apply(categorize_document, verify=verify)
+    return df
+
+
+def run_ahead(batches, depth: int = 1):
+    """
+    Iterates `batches` in a background thread, keeping up to `depth` batches ready.
+
+    Putting each model stage behind `run_ahead` lets it work on the next batch while
+    the following stage works on the current one, so both feed a shared
+    `PromptScheduler` at once. Errors raised upstream are raised to the consumer.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(("batch", batch)):
+                    return
+            put(("done", None))
+        except BaseException as e:
+            put(("error", e))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            kind, item = ready.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def journal_name(batch: pd.DataFrame, model: str, text_column: str = TEXT_COLUMN) -> str:
+    """
+    Returns the journal directory name of a batch, a hash of the model and of the batch's rows and texts.
+
+    A restarted run feeds the same batches and resumes their journals, while a
+    refresh, which only feeds new or changed decisions, gets journals of its own.
+    """
+    digest = hashlib.sha256(model.encode())
+    digest.update(pd.util.hash_pandas_object(batch[text_column], index=True).values.tobytes())
+    return f"batch-{digest.hexdigest()[:16]}"
+
+
+def _model_stage(name, extract, journal_dir, model, overlap=False, report=None):
+    # Each batch gets its own journal, named after its content, so a restarted run resumes batch by batch
+    def stage(batches):
+        for batch in batches:
+            journal = None if journal_dir is None else os.path.join(journal_dir, name, journal_name(batch, model))
+            batch = extract(batch, journal)
+            if len(batch):
+                yield batch
+
+    # Measured inside run_ahead, in the thread that does the stage's work
+    if report is not None:
+        stage = report.wrap_stage(name, stage)
+    if overlap:
+        return lambda batches: run_ahead(stage(batches))
+    return stage
+
+
+def build_stages(model: str = DEFAULT_MODEL, client: OllamaClient = None, journal_dir: str = None,
+                 verify_matcher: bool = False, pool: TextPool = None, dedup: TranslationDedup = None,
+                 min_keyword_hits: int = DEFAULT_MIN_KEYWORD_HITS, overlap: bool = False,
+                 report: RunReport = None) -> list:
+    """
+    Returns the pipeline stages in order, as (name, stage) pairs.
+
+    Parameters
+    ----------
+    model : str, optional
+        The language model used by the model stages (default is "llama3").
+    client : OllamaClient or PromptScheduler, optional
+        The client used by the model stages (default is the shared client).
+    journal_dir : str, optional
+        Directory where the model stages journal their progress (default is no journal).
+    verify_matcher : bool, optional
+        If True, `categorize_document` checks its results against the per-pattern search
+        (default is False).
+    pool : TextPool, optional
+        Process pool running the text filters in parallel (default is to run them in this process).
+    dedup : TranslationDedup, optional
+        The translation filter. Pass one built with `TranslationDedup.from_batches` so that
+        batches stream through without waiting for the rest of the corpus (default is a new,
+        incremental one).
+    min_keyword_hits : int, optional
+        The keyword matches for which a case citing a single IRPA section is classified
+        without the model (default is 3); 0 or None sends every case to the model.
+    overlap : bool, optional
+        If True, each model stage runs in its own thread, one batch ahead of the next
+        stage (see `run_ahead`). Use with a `PromptScheduler` client (default is False).
+    report : RunReport, optional
+        The report in which each stage records its rows, time and model calls
+        (default is no report).
+
+    Returns
+    -------
+    list of tuple
+        The stage names and stage functions.
+    """
+    def classify(batch, journal):
+        batch = classify_inadmissibility(batch, model=model, client=client, journal_dir=journal,
+                                         min_keyword_hits=min_keyword_hits)
+        batch = batch.query("inadmissibility == 'Inadmissibility'")
+        return batch.drop("inadmissibility", axis=1)
+
+    def decision_fields(batch, journal):
+        return extract_decision_fields_from_dataframe(batch, 30, -50, -20, model=model, client=client,
+                                                      journal_dir=journal)
+
+    dedup = dedup or TranslationDedup()
+
+    stages = [
+        ("remove_translated_cases", dedup.stream),
+        ("immigration_cases", map_stage(partial(filter_immigration_cases, pool=pool))),
+        ("filter_refugee_cases", map_stage(partial(filter_refugee_cases, pool=pool))),
+        ("filter_inadmissibility", map_stage(partial(filter_inadmissibility, pool=pool))),
+        ("categorize_document", map_stage(partial(add_inadmissibility_ground, verify=verify_matcher))),
+    ]
+    if report is not None:
+        stages = [(name, report.wrap_stage(name, stage)) for name, stage in stages]
+    return stages + [
+        ("classify_inadmissibility",
+         _model_stage("classify_inadmissibility", classify, journal_dir, model, overlap, report)),
+        ("extract_decision_fields",
+         _model_stage("extract_decision_fields", decision_fields, journal_dir, model, overlap, report)),
+    ]
+
+
+def run_pipeline(batches, stages: list, stop_after: str = None):
+    """
+    Chains the stages over the input batches.
+
+    Parameters
+    ----------
+    batches : iterable of pandas.DataFrame
+        The decisions to process.
+    stages : list of tuple
+        The (name, stage) pairs returned by `build_stages`.
+    stop_after : str, optional
+        The name of the last stage to run (default is every stage).
+
+    Returns
+    -------
+    generator of pandas.DataFrame
+        The batches coming out of the last stage.
+    """
+    names = [name for name, _ in stages]
+    if stop_after is not None and stop_after not in names:
+        raise ValueError(f"Unknown stage {stop_after!r}; expected one of {names}.")
+
+    for name, stage in stages:
+        batches = stage(batches)
+        if name == stop_after:
+            break
+    return batches
+
+
+def collect(batches) -> pd.DataFrame:
+    """Concatenates the output batches into one DataFrame with a fresh index."""
+    batches = list(batches)
+    if not batches:
+        return pd.DataFrame()
+    return pd.concat(batches).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the court case verification table.")
+    parser.add_argument("--source", default=None,
+                        help="Local copy of the decisions (save_to_disk directory or Parquet files); "
+                             "default is the Hugging Face cache.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Excel file to write.")
+    parser.add_argument("--stop-after", default=None, help="Name of the last stage to run.")
+    parser.add_argument("--journal-dir", default=None, help="Directory journaling the model stages.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Language model to use.")
+    parser.add_argument("--verify-matcher", action="store_true",
+                        help="Check the inadmissibility grounds against the per-pattern search.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Decisions per batch.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes running the text filters; 0 uses every CPU.")
+    parser.add_argument("--min-keyword-hits", type=int, default=DEFAULT_MIN_KEYWORD_HITS,
+                        help="Keyword matches for which a case citing a single IRPA section is classified "
+                             "without the model; 0 sends every case to the model.")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Model requests sent at once.")
+    parser.add_argument("--batch-tokens", type=int, default=8192,
+                        help="Estimated prompt tokens dispatched to the model in one micro-batch.")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH,
+                        help="Manifest of the stages completed per decision; only new or changed decisions are processed.")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore the manifest and process every decision.")
+    parser.add_argument("--report", default=None, help="JSON file for the per-stage run report.")
+    args = parser.parse_args()
+
+    report = RunReport("fc_pipeline")
+
+    pool = TextPool(args.workers or None) if args.workers != 1 else None
+    client = get_client()
+    scheduler = PromptScheduler(client, args.max_in_flight, args.batch_tokens)
+    try:
+        # Citations and languages only: the text is read once, by the main scan
+        dedup = TranslationDedup.from_batches(report.wrap_source(
+            "read_citations", iter_decisions(args.source, columns=["citation", "language"], batch_size=args.batch_size)
+        ))
+        batches = report.wrap_source("read_decisions", iter_decisions(args.source, batch_size=args.batch_size))
+        stages = build_stages(model=args.model, client=scheduler, journal_dir=args.journal_dir,
+                              verify_matcher=args.verify_matcher, pool=pool, dedup=dedup,
+                              min_keyword_hits=args.min_keyword_hits, overlap=True, report=report)
+        manifest = RefreshManifest(args.manifest)
+        if args.full_refresh:
+            manifest.clear()
+        result = refresh(batches, stages, manifest, args.model, args.stop_after, MODEL_STAGES)
+        with report.measure("save_manifest", rows_in=len(manifest.records)) as counts:
+            manifest.save()
+            counts["rows_out"], counts["bytes_written"] = len(manifest.records), os.path.getsize(args.manifest)
+        print(f"Collapsed {dedup.collapsed} French/English pairs.")
+        if prompt_tokens.counts:
+            print("Estimated prompt tokens sent to the model:")
+            print(prompt_tokens.summary().to_string())
+        metrics = scheduler.metrics()
+        if metrics["submitted"]:
+            print(f"Model requests: {metrics['cache_hits']} answered from the cache, "
+                  f"{metrics['completed']} completed, {metrics['failed']} failed in "
+                  f"{metrics['batches']} micro-batches (mean size {metrics['mean_batch_size']:.1f}, "
+                  f"max queue depth {metrics['max_queue_depth']}); latency p50 {metrics['latency_p50']:.2f}s, "
+                  f"p95 {metrics['latency_p95']:.2f}s.")
+        if client.cache is not None:
+            report.attach("prompt_cache", client.cache.stats())
+    finally:
+        scheduler.close()
+        if pool is not None:
+            pool.close()
+
+    if args.stop_after is None:
+        result = result.drop(columns=VERIFICATION_DROP_COLUMNS, errors="ignore")
+    with report.measure("write_output", rows_in=len(result)) as counts:
+        result.to_excel(args.output)
+        counts["rows_out"], counts["bytes_written"] = len(result), os.path.getsize(args.output)
+    print(f"Wrote {len(result)} cases to {args.output}")
+
+    report.print_summary()
+    if args.report is not None:
+        report.write_json(args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from fc_pipeline.llm import OllamaClient, get_client
+from fc_pipeline.windows import estimate_tokens
+
+_Request = collections.namedtuple("_Request", ["prompt", "model", "stage", "tokens", "future", "queued_at"])
+
+
+class PromptScheduler:
+    """
+    Queue shared by the model stages that dispatches prompts in micro-batches.
+
+    Prompts submitted by any stage or thread wait in one queue. Whenever requests
+    finish, the dispatcher sends the next micro-batch: as many queued prompts as
+    there are free slots under `max_in_flight`, up to `max_batch_tokens` estimated
+    tokens. Each prompt's response resolves the future returned to its caller, so
+    results go back to the row and stage that asked. Prompts the client's cache
+    already answered resolve at once, without waiting in the queue.
+
+    The scheduler has the `generate` and `generate_many` methods of `OllamaClient`
+    and can be passed as the `client` of the extraction functions. Point the client
+    at a fake server (e.g. with OLLAMA_HOST) to test it with a chosen latency.
+
+    Parameters
+    ----------
+    client : OllamaClient, optional
+        The client sending the requests (default is the shared client).
+    max_in_flight : int, optional
+        The maximum number of requests sent and not yet answered (default is 4).
+    max_batch_tokens : int, optional
+        The maximum estimated prompt tokens dispatched in one micro-batch; a single
+        larger prompt is sent alone (default is 8192).
+    """
+
+    def __init__(self, client: OllamaClient = None, max_in_flight: int = 4, max_batch_tokens: int = 8192):
+        self.client = client or get_client()
+        self.model = self.client.model
+        self.max_in_flight = max_in_flight
+        self.max_batch_tokens = max_batch_tokens
+        self._queue = collections.deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="prompt-scheduler", daemon=True)
+        self._stats = {"submitted": 0, "cache_hits": 0, "completed": 0, "failed": 0, "max_queue_depth": 0}
+        self._batch_sizes, self._latencies, self._waits = [], [], []
+        self._by_stage = collections.Counter()
+        self._dispatcher.start()
+
+    def submit(self, prompt: str, model: str = None, stage: str = "") -> Future:
+        """
+        Queues one prompt.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt text.
+        model : str, optional
+            The model to use (default is the client's model).
+        stage : str, optional
+            A label counted in the metrics (default is "").
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the stripped model output, or to the request's exception. A
+            prompt found in the client's cache is resolved before it is returned.
+        """
+        future = Future()
+        cached = self.client.cached(prompt, model)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The scheduler is closed.")
+            self._stats["submitted"] += 1
+            self._by_stage[stage] += 1
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                future.set_result(cached)
+                return future
+            self._queue.append(_Request(prompt, model, stage, estimate_tokens(prompt), future, time.perf_counter()))
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queue))
+            self._cond.notify_all()
+        return future
+
+    def generate(self, prompt: str, model: str = None) -> str:
+        """Queues one prompt and waits for its output."""
+        return self.submit(prompt, model).result()
+
+    def generate_many(self, prompts: list, model: str = None, on_error: str = None, stage: str = "") -> list:
+        """
+        Queues several prompts and returns the outputs in order.
+
+        Parameters
+        ----------
+        prompts : list of str
+            The prompts.
+        model : str, optional
+            The model to use (default is the client's model).
+        on_error : str, optional
+            Returned in place of the output of a failed request. By default the first
+            failure is raised.
+        stage : str, optional
+            A label counted in the metrics (default is "").
+
+        Returns
+        -------
+        list of str
+        """
+        futures = [self.submit(prompt, model, stage) for prompt in prompts]
+        outputs = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and on_error is None:
+                raise error
+            outputs.append(on_error if error is not None else future.result())
+        return outputs
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._queue or self._in_flight >= self.max_in_flight):
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                batch, tokens = [], 0
+                while self._queue and self._in_flight + len(batch) < self.max_in_flight:
+                    if batch and tokens + self._queue[0].tokens > self.max_batch_tokens:
+                        break
+                    request = self._queue.popleft()
+                    batch.append(request)
+                    tokens += request.tokens
+                self._in_flight += len(batch)
+                self._batch_sizes.append(len(batch))
+            for request in batch:
+                self._executor.submit(self._run, request)
+
+    def _run(self, request):
+        started = time.perf_counter()
+        try:
+            output = self.client.request(request.prompt, request.model)
+        except Exception as e:
+            error, output = e, None
+        else:
+            error = None
+        finished = time.perf_counter()
+        with self._cond:
+            self._in_flight -= 1
+            self._stats["failed" if error is not None else "completed"] += 1
+            self._latencies.append(finished - started)
+            self._waits.append(started - request.queued_at)
+            self._cond.notify_all()
+        if error is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(output)
+
+    def metrics(self) -> dict:
+        """
+        Returns the scheduler's counters.
+
+        Returns
+        -------
+        dict
+            The prompts submitted, answered from the client's cache without being
+            queued, completed and failed, and the prompts per stage; the
+            current and maximum queue depth and requests in flight; the number of
+            micro-batches with their mean and maximum size; and the 50th and 95th
+            percentiles, in seconds, of the request latency and of the time spent queued.
+        """
+        with self._cond:
+            metrics = dict(self._stats, queue_depth=len(self._queue), in_flight=self._in_flight,
+                           by_stage=dict(self._by_stage), batches=len(self._batch_sizes))
+            batch_sizes, latencies, waits = list(self._batch_sizes), list(self._latencies), list(self._waits)
+        metrics["mean_batch_size"] = float(np.mean(batch_sizes)) if batch_sizes else 0.0
+        metrics["max_batch_size"] = max(batch_sizes, default=0)
+        for name, values in (("latency", latencies), ("wait", waits)):
+            p50, p95 = np.percentile(values, [50, 95]) if values else (0.0, 0.0)
+            metrics[f"{name}_p50"], metrics[f"{name}_p95"] = float(p50), float(p95)
+        return metrics
+
+    def close(self) -> None:
+        """Waits for the queued prompts to be answered and stops the dispatcher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,161 @@
+import math
+import re
+import threading
+
+import pandas as pd
+
+from fc_pipeline.categorize import extract_numbered_lines
+
+CHARS_PER_TOKEN = 4
+JUDGMENT_MARKERS = re.compile(
+    r"^\s*(?:THIS\s+COURT['’]?S\s+(?:JUDGMENT|ORDER)|THIS\s+COURT\s+ORDERS|LE\s+JUGEMENT\s+DE\s+LA\s+COUR|"
+    r"LA\s+COUR\s+(?:STATUE|ORDONNE)|(?:JUDGMENT|JUGEMENT|ORDER|ORDONNANCE)(?:\s+(?:IN|DANS)\s.*)?\s*$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+RECORD_MARKERS = re.compile(r"^\s*(?:SOLICITORS|COUNSEL)\s+OF\s+RECORD|^\s*AVOCATS\s+INSCRITS", re.IGNORECASE | re.MULTILINE)
+PLACE_MARKER = re.compile(r"^\s*(?:PLACE\s+OF\s+HEARING|LIEU\s+DE\s+L['’]AUDIENCE)\s*:.*$", re.IGNORECASE | re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of model tokens in a text, at about four characters per token."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def fit_lines(lines: list, budget: int) -> str:
+    """
+    Joins as many whole lines as fit in `budget` tokens.
+
+    Parameters
+    ----------
+    lines : list of str
+    budget : int
+        The maximum number of tokens, as counted by `estimate_tokens`.
+
+    Returns
+    -------
+    str
+        The kept lines. If not even the first line fits, that line cut to the budget.
+    """
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    if not kept and lines:
+        return lines[0][:max(budget, 0) * CHARS_PER_TOKEN]
+    return "\n".join(kept)
+
+
+def header_window(text: str, budget: int = 512, start: int = 0, end: int = 30) -> str:
+    """
+    Returns lines `start` to `end` of a decision, and its "PLACE OF HEARING" line if any,
+    within `budget` tokens.
+
+    Parameters
+    ----------
+    text : str
+    budget : int, optional
+        The maximum number of tokens (default is 512).
+    start : int, optional
+        The first line (default is 0).
+    end : int, optional
+        The line after the last line (default is 30).
+
+    Returns
+    -------
+    str
+    """
+    lines = text.splitlines()[start:end]
+    place = PLACE_MARKER.search(text)
+    # The match can start with the blank lines before it, so compare stripped lines
+    if place is None or place.group(0).strip() in (line.strip() for line in lines):
+        return fit_lines(lines, budget)
+    place_line = place.group(0).strip()
+    return fit_lines(lines, budget - estimate_tokens(place_line + "\n")) + "\n" + place_line
+
+
+def reasons_window(text: str, budget: int = 1024) -> str:
+    """
+    Returns the leading numbered paragraphs of a decision (see `extract_numbered_lines`)
+    that fit in `budget` tokens.
+
+    Parameters
+    ----------
+    text : str
+    budget : int, optional
+        The maximum number of tokens (default is 1024).
+
+    Returns
+    -------
+    str
+    """
+    return fit_lines(extract_numbered_lines(text).splitlines(), budget)
+
+
+def judgment_window(text: str, budget: int = 256, start: int = -50, end: int = -20) -> str:
+    """
+    Returns the operative part of a decision within `budget` tokens.
+
+    The window starts at the last judgment marker ("THIS COURT'S JUDGMENT is",
+    "JUDGMENT", "LE JUGEMENT DE LA COUR", "ORDER", ...) and stops before the
+    solicitors of record. Without a marker, lines `start` to `end` are used.
+
+    Parameters
+    ----------
+    text : str
+    budget : int, optional
+        The maximum number of tokens (default is 256).
+    start : int, optional
+        The first line of the fallback excerpt (default is -50).
+    end : int, optional
+        The line after the last line of the fallback excerpt (default is -20).
+
+    Returns
+    -------
+    str
+    """
+    markers = list(JUDGMENT_MARKERS.finditer(text))
+    if not markers:
+        return fit_lines(text.splitlines()[start:end], budget)
+    section = text[markers[-1].start():]
+    record = RECORD_MARKERS.search(section)
+    if record is not None:
+        section = section[:record.start()]
+    return fit_lines(section.strip().splitlines(), budget)
+
+
+class TokenLedger:
+    """
+    Counts the prompts and estimated prompt tokens sent for each kind of prompt.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, prompts: list) -> None:
+        """Adds the `estimate_tokens` of each prompt to the totals of `stage`."""
+        if not prompts:
+            return
+        tokens = [estimate_tokens(prompt) for prompt in prompts]
+        with self._lock:
+            counts = self.counts.setdefault(stage, {"prompts": 0, "tokens": 0, "max_tokens": 0})
+            counts["prompts"] += len(tokens)
+            counts["tokens"] += sum(tokens)
+            counts["max_tokens"] = max([counts["max_tokens"]] + tokens)
+
+    def summary(self) -> pd.DataFrame:
+        """Returns the prompts, total tokens, mean tokens and largest prompt per stage."""
+        summary = pd.DataFrame.from_dict(self.counts, orient="index", columns=["prompts", "tokens", "max_tokens"])
+        summary.insert(2, "mean_tokens", (summary["tokens"] / summary["prompts"]).round(1))
+        summary.index.name = "stage"
+        return summary
+
+    def reset(self) -> None:
+        """Clears the totals."""
+        self.counts = {}
+
+
+prompt_tokens = TokenLedger()
@@ -1,29 +1,73 @@
+"""
+Tidies the IRCC A34 inadmissibility workbook, or a directory of its releases.
+
+Run from the repository root as a module, so the shared run report of
+fc_pipeline can be imported:
+
+    python -m scripts.01_tidy_a34_data data/raw/a34_1_refused.xlsx data/processed/a34_1_refused_cleaned.csv
+"""
 import pandas as pd
 import argparse
+import glob
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from fc_pipeline.instrument import RunReport
 
-def process_and_save_data(file_path: str, output_path: str) -> None:
+# Maps the suffix pandas appends to repeated year headers (2018, 2018.1, 2018.2, 2018.3)
+# to the (cor_status, resident) pair that block of columns reports.
+STATUS_BY_SUFFIX = {
+    '': ('COR Not Canada', 'Permanent Resident'),
+    '1': ('COR Canada', 'Permanent Resident'),
+    '2': ('COR Not Canada', 'Temporary Resident'),
+    '3': ('COR Canada', 'Temporary Resident'),
+}
+
+def decode_year_columns(columns: pd.Index) -> pd.DataFrame:
     """
-    Processes an Excel file containing data about inadmissibility grounds by country 
-    and year, and saves the tidy version of the data into a CSV file.
+    Decodes year column labels into the year, COR status and resident status they report.
+
+    Parameters
+    ----------
+    columns : pd.Index
+        The year column labels, e.g. '2018', '2018.1', '2018.2', '2018.3'.
+
+    Returns
+    -------
+    pd.DataFrame
+        A lookup table indexed by column label, with 'year', 'cor_status' and 'resident' columns.
+    """
+    lookup = []
+    for col in columns:
+        year, _, suffix = str(col).partition('.')
+        cor_status, resident = STATUS_BY_SUFFIX.get(suffix, STATUS_BY_SUFFIX[''])
+        lookup.append((int(float(year)), cor_status, resident))
+    return pd.DataFrame(lookup, index=columns, columns=['year', 'cor_status', 'resident'])
+
+def tidy_a34_data(file_path: str) -> pd.DataFrame:
+    """
+    Processes an Excel file containing data about inadmissibility grounds by country
+    and year into a tidy DataFrame.
 
     Parameters
     ----------
     file_path : str
         The file path to the Excel file containing the data.
-    output_path : str
-        The file path where the processed data in CSV format will be saved.
 
     Returns
     -------
-    None
-        The function saves the tidy DataFrame into a CSV file at the specified location.
-    
+    pd.DataFrame
+        One row per inadmissibility ground, country, year, COR status and resident status.
+
     Notes
     -----
     - The function processes the data by filling missing values with 0 and converts numeric columns to integers.
-    - The data is split into sections based on rows containing digits and reorganized into a long format.
-    - Additional columns for 'cor_status' and 'resident' are derived from the year column.
+    - Rows containing digits are section headers; each country row takes the inadmissibility ground of the
+      nearest header above it, and the whole table is reorganized into a long format in a single melt.
+    - Additional columns for 'cor_status' and 'resident' are decoded from the year column suffix
+      through STATUS_BY_SUFFIX.
     """
     df = pd.read_excel(file_path, skiprows=5, skipfooter=8)
 
@@ -32,86 +76,182 @@ def process_and_save_data(file_path: str, output_path: str) -> None:
 
     mask = df['Unnamed: 0'].str.contains(r'\d', regex=True)
 
-    split_indices = df.index[mask].tolist()
-    split_indices.append(df.index[-1] + 1)
-
-    dfs = []
-    start_idx = 0
-    for end_idx in split_indices:
-        # Skip rows containing digits
-        if mask[start_idx]:
-            start_idx += 1
-        
-        # Select sub_df from start_idx to end_idx, excluding the row containing the digit
-        sub_df = df.iloc[start_idx:end_idx].copy()
-        
-        # Skip empty sub_df
-        if sub_df.empty:
-            start_idx = end_idx
-            continue
-        
-        # Assign 'inadmissibility_grounds' column with the value from previous split row
-        inadmissibility_value = df['Unnamed: 0'].iloc[start_idx - 1]
-        sub_df['inadmissibility_grounds'] = inadmissibility_value
-
-        sub_df.rename(columns={'Unnamed: 0': 'country'}, inplace=True)
-
-        dfs.append(sub_df)
-        start_idx = end_idx
-
-    def remove_unwanted_columns(df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Removes columns containing 'Unnamed' or 'Total' in their names.
-
-        Parameters
-        ----------
-        df : pd.DataFrame
-            The input DataFrame to remove unwanted columns from.
-
-        Returns
-        -------
-        pd.DataFrame
-            The DataFrame after removing unwanted columns.
-        """
-        df = df.loc[:, ~df.columns.str.contains('Unnamed|Total')]
-        return df
-
-    dfs = [remove_unwanted_columns(df) for df in dfs]
-
-    dfs_long = []
-    for df in dfs:
-        df_long = pd.melt(df, 
-                          id_vars=['country', 'inadmissibility_grounds'], 
-                          var_name='year', 
-                          value_name='count')
-        dfs_long.append(df_long)
-
-    for df_long in dfs_long:
-        df_long['cor_status'] = df_long['year'].apply(
-            lambda x: 'COR Canada' if '.1' in str(x) or '.3' in str(x) else 'COR Not Canada'
-        )
-        df_long['resident'] = df_long['year'].apply(
-            lambda x: 'Temporary Resident' if '.2' in str(x) or '.3' in str(x) else 'Permanent Resident'
-        )
-        df_long['year'] = df_long['year'].astype(float).astype(int)
-
-    df = pd.concat(dfs_long, ignore_index=True)
-
-    df = df[['inadmissibility_grounds', 'country', 'year', 'cor_status', 'resident', 'count']]
+    # Forward-fill each section header onto the country rows below it
+    df['inadmissibility_grounds'] = df['Unnamed: 0'].where(mask).ffill()
+    df['section'] = mask.cumsum()
+    df = df[~mask & df['inadmissibility_grounds'].notna()]
+
+    df = df.rename(columns={'Unnamed: 0': 'country'})
+
+    # Remove columns containing 'Unnamed' or 'Total' in their names
+    df = df.loc[:, ~df.columns.str.contains('Unnamed|Total')]
+
+    df_long = pd.melt(df,
+                      id_vars=['section', 'country', 'inadmissibility_grounds'],
+                      var_name='year',
+                      value_name='count')
+
+    # Keep the section-by-section row order of the original per-section melts
+    df_long = df_long.sort_values('section', kind='stable', ignore_index=True)
+
+    lookup = decode_year_columns(df.columns.drop(['section', 'country', 'inadmissibility_grounds']))
+    decoded = lookup.iloc[lookup.index.get_indexer(df_long['year'])].reset_index(drop=True)
+    df_long[['year', 'cor_status', 'resident']] = decoded
+
+    return df_long[['inadmissibility_grounds', 'country', 'year', 'cor_status', 'resident', 'count']]
+
+def process_and_save_data(file_path: str, output_path: str, report: RunReport = None) -> None:
+    """
+    Processes an Excel file containing data about inadmissibility grounds by country
+    and year, and saves the tidy version of the data into a CSV file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the Excel file containing the data.
+    output_path : str
+        The file path where the processed data in CSV format will be saved.
+    report : RunReport, optional
+        The report in which the tidying and writing steps are recorded (default is no report).
+
+    Returns
+    -------
+    None
+        The function saves the tidy DataFrame into a CSV file at the specified location.
+    """
+    report = report or RunReport('process_and_save_data')
+    with report.measure('tidy_a34_data', bytes_read=os.path.getsize(file_path)) as counts:
+        df = tidy_a34_data(file_path)
+        counts['rows_out'] = len(df)
 
     output_dir = os.path.dirname(output_path)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
-    df.to_csv(output_path, index=False)
+
+    with report.measure('write_csv', rows_in=len(df)) as counts:
+        df.to_csv(output_path, index=False)
+        counts['rows_out'], counts['bytes_written'] = len(df), os.path.getsize(output_path)
 
     print(f"Data has been processed and saved to {output_path}")
 
+def resolve_input_files(input_path: str) -> list:
+    """
+    Lists the Excel releases named by a directory, a glob pattern or a single file.
+
+    Parameters
+    ----------
+    input_path : str
+        A directory of .xlsx files, a glob pattern, or the path of one Excel file.
+
+    Returns
+    -------
+    list of str
+        The matching file paths, sorted.
+    """
+    if os.path.isdir(input_path):
+        input_path = os.path.join(input_path, '*.xlsx')
+    return sorted(path for path in glob.glob(input_path) if not os.path.basename(path).startswith('~$'))
+
+def process_releases(input_files: list, output_dir: str, workers: int = None, report: RunReport = None) -> None:
+    """
+    Tidies several IRCC Excel releases in parallel into one Parquet dataset
+    partitioned by release.
+
+    Each release is written to `output_dir/source_release=<file name>/`, so reading
+    `output_dir` with `pd.read_parquet` returns the combined data with a
+    'source_release' column. A manifest of content hashes is kept in
+    `output_dir/_manifest.json`; releases whose content has not changed since the
+    last run are skipped.
+
+    Parameters
+    ----------
+    input_files : list of str
+        The Excel files to process.
+    output_dir : str
+        The directory of the partitioned Parquet output.
+    workers : int, optional
+        The number of worker processes (default is the number of CPUs).
+    report : RunReport, optional
+        The report in which the hashing, tidying and writing steps are recorded (default is
+        no report). The tidying time is the time spent waiting for the workers; their CPU
+        time is not included.
+
+    Returns
+    -------
+    None
+        The function writes one partition per changed release and updates the manifest.
+    """
+    releases = {os.path.splitext(os.path.basename(path))[0]: path for path in input_files}
+    if len(releases) != len(input_files):
+        raise ValueError('Input files must have distinct file names, which are used as source_release.')
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, '_manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    report = report or RunReport('process_releases')
+    pending = {}
+    with report.measure('hash_releases', rows_in=len(releases),
+                        bytes_read=sum(os.path.getsize(path) for path in releases.values())) as counts:
+        for release, path in releases.items():
+            with open(path, 'rb') as f:
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()
+            partition = os.path.join(output_dir, f'source_release={release}')
+            if manifest.get(release, {}).get('sha256') == digest and os.path.isdir(partition):
+                print(f"Skipping unchanged release {release}")
+                continue
+            pending[release] = digest
+        counts['rows_out'] = len(pending)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(tidy_a34_data, releases[release]): release for release in pending}
+        completed = as_completed(futures)
+        while True:
+            # Time spent waiting for the workers, between writes
+            with report.measure('tidy_a34_data') as counts:
+                future = next(completed, None)
+                if future is not None:
+                    release = futures[future]
+                    df = future.result()
+                    counts['rows_out'], counts['bytes_read'] = len(df), os.path.getsize(releases[release])
+            if future is None:
+                break
+
+            with report.measure('write_parquet', rows_in=len(df)) as counts:
+                partition = os.path.join(output_dir, f'source_release={release}')
+                os.makedirs(partition, exist_ok=True)
+                part_path = os.path.join(partition, 'part-0.parquet')
+                df.to_parquet(part_path, index=False)
+
+                manifest[release] = {'file': releases[release], 'sha256': pending[release]}
+                with open(manifest_path, 'w') as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+                counts['rows_out'], counts['bytes_written'] = len(df), os.path.getsize(part_path)
+
+            print(f"Release {release} has been processed and saved to {partition}")
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Process and save data from an Excel file to CSV.')
-    parser.add_argument('input_file', type=str, help='Path to the input Excel file')
-    parser.add_argument('output_file', type=str, help='Path to the output CSV file')
+    parser.add_argument('input_file', type=str,
+                        help='Path to the input Excel file, or a directory or glob of Excel releases for batch mode')
+    parser.add_argument('output_file', type=str,
+                        help='Path to the output CSV file, or the output directory in batch mode')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes in batch mode (default: number of CPUs)')
+    parser.add_argument('--report', type=str, default=None,
+                        help='Path of a JSON file for the per-step run report')
 
     args = parser.parse_args()
+    report = RunReport('01_tidy_a34_data')
+
+    if os.path.isdir(args.input_file) or glob.has_magic(args.input_file):
+        process_releases(resolve_input_files(args.input_file), args.output_file, args.workers, report)
+    else:
+        process_and_save_data(args.input_file, args.output_file, report)
 
-    process_and_save_data(args.input_file, args.output_file)
\ No newline at end of file
+    report.print_summary()
+    if args.report is not None:
+        report.write_json(args.report)
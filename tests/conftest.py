@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+
+def canned_response(prompt):
+    """Answers each kind of pipeline prompt the way the model is asked to."""
+    if "Python list" in prompt:
+        return "['John Doe']"
+    if "JSON" in prompt:
+        return json.dumps({"judges": ["John Doe"], "city": "Toronto", "outcome": "dismissed"})
+    if "Classification" in prompt:
+        return "Inadmissibility"
+    return "Toronto"
+
+
+class OllamaStub:
+    """
+    In-process stand-in for the Ollama /api/generate endpoint.
+
+    `latency` delays every response, `fail` returns a 500 for the prompts it
+    accepts, and `respond` gives the response to a prompt. With `drop_idle` the
+    server closes each connection after answering without telling the client,
+    as a keep-alive timeout does. The prompts received, the client connections
+    seen and the most requests handled at once are recorded.
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.fail = lambda prompt: False
+        self.respond = canned_response
+        self.drop_idle = False
+        self.prompts = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body.get("prompt", "")
+                with stub._lock:
+                    stub.prompts.append(prompt)
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                    if stub.fail(prompt):
+                        status, out = 500, b'{"error": "stub failure"}'
+                    else:
+                        status, out = 200, json.dumps({"model": body.get("model"), "response": stub.respond(prompt),
+                                                       "done": True}).encode()
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+                if stub.drop_idle:
+                    self.close_connection = True
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def ollama_stub():
+    stub = OllamaStub()
+    yield stub
+    stub.close()
+
+
+def make_decisions(citations) -> pd.DataFrame:
+    """Returns English immigration decisions that pass every text filter, one per citation."""
+    rows = []
+    for i, citation in enumerate(citations):
+        text = "\n".join([
+            f"Citation: {citation}",
+            "Toronto, Ontario",
+            f"PRESENT: The Honourable Mr. Justice Person{i}",
+            "BETWEEN:",
+            f"APPLICANT {citation}",
+            "and",
+            "The Minister of Citizenship and Immigration",
+            "JUDGMENT AND REASONS",
+            f"[1] The officer found the applicant inadmissible under s. 36(1) in file {citation}.",
+            "[2] The applicant seeks judicial review.",
+            "JUDGMENT",
+            "THIS COURT'S JUDGMENT is that the application is dismissed.",
+        ])
+        rows.append({"citation": citation, "citation2": "", "dataset": "FC", "year": 2020, "name": f"A v Canada {i}",
+                     "language": "en", "document_date": pd.Timestamp("2020-01-01"), "source_url": f"https://x/{i}",
+                     "scraped_timestamp": pd.Timestamp("2024-01-01"), "unofficial_text": text, "other": ""})
+    return pd.DataFrame(rows)
@@ -0,0 +1,88 @@
+import random
+import time
+
+import pytest
+
+from fc_pipeline.categorize import RE_patterns, SECTION_PATTERNS, GroundMatcher, _categorize_per_pattern, \
+    categorize_document, fold_case
+
+VOCABULARY = ("the of and to in a is that for on with as was by be this it are from at or an not which applicant "
+              "officer decision court judicial review reasons evidence minister application found federal board "
+              "risk visa permanent resident spouse family hearing appeal relief order counsel record").split()
+
+
+def _decision(rng, paragraphs, phrases=(), rate=0.0):
+    lines = []
+    for number in range(1, paragraphs + 1):
+        words = [rng.choice(VOCABULARY) for _ in range(100)]
+        if phrases and rng.random() < rate:
+            words[rng.randrange(len(words))] = rng.choice(phrases)
+        lines.append(f"[{number}] " + " ".join(words) + ".")
+    return "\n".join(lines)
+
+
+PHRASES = ["Criminal convictions", "crimİnal conviction", "crıminal convictions", "MISREPRESENTATION",
+           "material facts", "s. 36(2)", "section 40", "subsection 34", "war crimes", "Reasonable Grounds to believe",
+           "Canada’s interests", "over six months", "ſocial assistance", "acting in concert", "non-compliances"]
+
+
+@pytest.mark.parametrize("text", [
+    "[1] Criminal convictions abound",
+    # Letters that re.IGNORECASE matches to "i" but casefolding does not map to "i"
+    "[1] Crimİnal convictions abound",
+    "[1] crıminal convictions abound",
+    "[1] CRIMINAL CONVICTIONS under s. 36(2)",
+    "[1] nothing to see here",
+])
+def test_matcher_agrees_with_per_pattern_search(text):
+    assert GroundMatcher().categorize(text) == _categorize_per_pattern(text)
+    assert categorize_document(text, verify=True) == _categorize_per_pattern(text)
+
+
+def test_matcher_agrees_on_generated_decisions():
+    rng = random.Random(0)
+    matcher = GroundMatcher()
+    for _ in range(200):
+        text = _decision(rng, rng.randint(1, 12), PHRASES, rate=rng.random())
+        expected = (
+            [c for c, p in SECTION_PATTERNS.items() if p.search(text)],
+            [c for c, p in RE_patterns.items() if p.search(text)],
+        )
+        assert matcher.match(text) == expected
+        assert matcher.categorize(text) == _categorize_per_pattern(text)
+
+
+def test_fold_case_keeps_ignorecase_literals():
+    assert "criminal" in fold_case("CRIMİNAL")
+    assert "social" in fold_case("ſOCIAL")
+    assert "kept" in fold_case("KEPT")
+
+
+def test_only_patterns_with_a_literal_in_the_text_are_run():
+    matcher = GroundMatcher()
+    assert matcher.candidates("[1] The applicant seeks judicial review.") == set()
+    categories = list(SECTION_PATTERNS) + list(RE_patterns)
+    assert {categories[i] for i in matcher.candidates("[1] a material fact")} == {"misrepresentation"}
+
+
+def _best_time(function, texts, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_matcher_is_faster_than_per_pattern_search():
+    # Benchmark: long decisions naming few grounds, where every pattern scans the whole text
+    rng = random.Random(1)
+    texts = [_decision(rng, 40, PHRASES, rate=0.02) for _ in range(20)]
+    matcher = GroundMatcher()
+
+    per_pattern = _best_time(_categorize_per_pattern, texts)
+    single_scan = _best_time(matcher.categorize, texts)
+
+    assert [matcher.categorize(t) for t in texts] == [_categorize_per_pattern(t) for t in texts]
+    assert single_scan < per_pattern / 1.25, f"{single_scan:.3f}s vs {per_pattern:.3f}s per-pattern"
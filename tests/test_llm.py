@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from fc_pipeline.llm import OllamaClient, OllamaError
+
+
+def test_requests_reuse_one_connection(ollama_stub):
+    client = OllamaClient(ollama_stub.url)
+    outputs = [client.generate(f"prompt {n}") for n in range(5)]
+
+    assert outputs == ["Toronto"] * 5
+    assert len(ollama_stub.prompts) == 5
+    assert len(ollama_stub.connections) == 1
+
+
+def test_stale_connection_is_retried_on_a_fresh_one(ollama_stub):
+    ollama_stub.drop_idle = True
+    client = OllamaClient(ollama_stub.url)
+
+    assert client.generate("first") == "Toronto"
+    time.sleep(0.05)
+    # The pooled connection was closed by the server while idle
+    assert client.generate("second") == "Toronto"
+    assert ollama_stub.prompts == ["first", "second"]
+    assert len(ollama_stub.connections) == 2
+
+
+def test_error_status_raises(ollama_stub):
+    ollama_stub.fail = lambda prompt: prompt == "bad"
+    client = OllamaClient(ollama_stub.url)
+
+    with pytest.raises(OllamaError, match="500"):
+        client.generate("bad")
+    # The connection is still usable after an error response
+    assert client.generate("good") == "Toronto"
+    assert client.generate_many(["good", "bad"], on_error="model_error") == ["Toronto", "model_error"]
+
+
+def test_unreachable_server_raises():
+    client = OllamaClient("http://127.0.0.1:9", timeout=1)
+    with pytest.raises(OllamaError):
+        client.generate("prompt")
+
+
+def test_agenerate_stays_under_max_concurrency(ollama_stub):
+    ollama_stub.latency = 0.05
+    client = OllamaClient(ollama_stub.url, max_concurrency=2)
+
+    outputs = asyncio.run(client.agenerate_many([f"prompt {n}" for n in range(8)]))
+
+    assert outputs == ["Toronto"] * 8
+    assert ollama_stub.max_in_flight == 2
+
+
+def test_generate_many_keeps_prompt_order(ollama_stub):
+    def respond(prompt):
+        # Earlier prompts answer last
+        time.sleep(0.01 * (10 - int(prompt)))
+        return f"answer {prompt}"
+
+    ollama_stub.respond = respond
+    client = OllamaClient(ollama_stub.url, max_concurrency=4)
+    prompts = [str(n) for n in range(10)]
+
+    assert client.generate_many(prompts) == [f"answer {n}" for n in range(10)]
+    assert ollama_stub.max_in_flight == 4
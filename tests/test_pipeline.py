@@ -0,0 +1,64 @@
+from conftest import make_decisions
+
+from fc_pipeline.filters import TranslationDedup
+from fc_pipeline.instrument import RunReport
+from fc_pipeline.llm import OllamaClient
+from fc_pipeline.manifest import RefreshManifest, refresh
+from fc_pipeline.pipeline import MODEL_STAGES, build_stages, iter_frames
+
+
+def _refresh(df, client, manifest_path, journal_dir, report=None):
+    manifest = RefreshManifest(manifest_path)
+    dedup = TranslationDedup.from_batches(iter_frames(df, 2))
+    stages = build_stages(client=client, journal_dir=journal_dir, dedup=dedup, report=report)
+    result = refresh(iter_frames(df, 2), stages, manifest, "llama3", model_stages=MODEL_STAGES)
+    manifest.save()
+    return result
+
+
+def test_refreshes_in_a_row_with_a_journal(tmp_path, ollama_stub):
+    client = OllamaClient(ollama_stub.url)
+    manifest_path, journal_dir = str(tmp_path / "manifest.parquet"), str(tmp_path / "journal")
+    first = make_decisions([f"2020 FC {n}" for n in range(5)])
+
+    assert len(_refresh(first, client, manifest_path, journal_dir)) == 5
+    sent = len(ollama_stub.prompts)
+
+    # Only the two new decisions reach the model stages, in batches unlike the first run's
+    second = make_decisions([f"2020 FC {n}" for n in range(7)])
+    result = _refresh(second, client, manifest_path, journal_dir)
+
+    assert sorted(result["citation"]) == sorted(second["citation"])
+    assert len(ollama_stub.prompts) - sent == 2 * sent // 5
+
+
+def test_restarted_run_resumes_its_journal(tmp_path, ollama_stub):
+    client = OllamaClient(ollama_stub.url)
+    journal_dir = str(tmp_path / "journal")
+    df = make_decisions([f"2020 FC {n}" for n in range(4)])
+
+    _refresh(df, client, str(tmp_path / "first.parquet"), journal_dir)
+    sent = len(ollama_stub.prompts)
+    # Same rows without a manifest: every batch is read back from its journal
+    result = _refresh(df, client, str(tmp_path / "second.parquet"), journal_dir)
+
+    assert len(result) == 4
+    assert len(ollama_stub.prompts) == sent
+
+
+def test_report_counts_model_calls_avoided(tmp_path, ollama_stub):
+    df = make_decisions([f"2020 FC {n}" for n in range(4)])
+    # Two decisions repeat the keywords of the section they cite, s. 36(1)
+    for i in (0, 1):
+        df.loc[i, "unofficial_text"] = df.loc[i, "unofficial_text"].replace(
+            "[2] The applicant seeks judicial review.",
+            "[2] A criminal conviction, a sentence of imprisonment over six months.")
+    report = RunReport("test")
+
+    result = _refresh(df, OllamaClient(ollama_stub.url), str(tmp_path / "manifest.parquet"), None, report)
+
+    assert len(result) == 4
+    totals = report.to_dict()
+    assert totals["model_calls_avoided"] == 4
+    assert report.summary().loc["classify_inadmissibility", "model_calls"] == 4
+    assert totals["model_calls"] == len(ollama_stub.prompts)
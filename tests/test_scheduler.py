@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from fc_pipeline.cache import PromptCache
+from fc_pipeline.instrument import RunReport
+from fc_pipeline.llm import OllamaClient, OllamaError
+from fc_pipeline.scheduler import PromptScheduler
+
+
+def _echo(prompt):
+    return f"answer to {prompt.strip()}"
+
+
+@pytest.fixture
+def client(ollama_stub):
+    ollama_stub.respond = _echo
+    # The scheduler, not the client, limits the requests in flight
+    return OllamaClient(ollama_stub.url, max_concurrency=16)
+
+
+def test_requests_in_flight_stay_under_the_limit(ollama_stub, client):
+    ollama_stub.latency = 0.05
+    with PromptScheduler(client, max_in_flight=3) as scheduler:
+        outputs = scheduler.generate_many([f"prompt {n}" for n in range(12)])
+
+    assert outputs == [f"answer to prompt {n}" for n in range(12)]
+    assert ollama_stub.max_in_flight == 3
+
+
+def test_batches_are_split_by_token_budget(ollama_stub, client):
+    prompts = [f"{n:02d}".ljust(400) for n in range(6)]  # 100 tokens each
+    with PromptScheduler(client, max_in_flight=8, max_batch_tokens=250) as scheduler:
+        # Queue every prompt before the dispatcher can take any
+        with scheduler._cond:
+            futures = [scheduler.submit(prompt) for prompt in prompts]
+        large = scheduler.submit("large".ljust(4000))
+        outputs = [future.result() for future in futures]
+        large.result()
+        metrics = scheduler.metrics()
+
+    assert outputs == [f"answer to {n:02d}" for n in range(6)]
+    # Six prompts in batches of two, then the prompt over budget on its own
+    assert metrics["batches"] == 4
+    assert metrics["max_batch_size"] == 2
+    assert metrics["mean_batch_size"] == pytest.approx(7 / 4)
+
+
+def test_failures_go_back_to_their_caller(ollama_stub, client):
+    ollama_stub.fail = lambda prompt: "bad" in prompt
+    results = {}
+
+    with PromptScheduler(client, max_in_flight=2) as scheduler:
+        def caller(name):
+            future = scheduler.submit(name)
+            try:
+                results[name] = future.result()
+            except OllamaError as e:
+                results[name] = e
+
+        threads = [threading.Thread(target=caller, args=(name,)) for name in ("good 1", "bad 1", "good 2", "bad 2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        outputs = scheduler.generate_many(["good 3", "bad 3"], on_error="model_error")
+        assert outputs == ["answer to good 3", "model_error"]
+        with pytest.raises(OllamaError):
+            scheduler.generate_many(["good 4", "bad 4"])
+
+    assert results["good 1"] == "answer to good 1"
+    assert results["good 2"] == "answer to good 2"
+    assert isinstance(results["bad 1"], OllamaError)
+    assert isinstance(results["bad 2"], OllamaError)
+
+
+def test_metrics_count_requests_and_latency(ollama_stub, client):
+    ollama_stub.latency = 0.05
+    ollama_stub.fail = lambda prompt: prompt == "bad"
+
+    with PromptScheduler(client, max_in_flight=2) as scheduler:
+        scheduler.generate_many(["a", "b", "c"], stage="judges")
+        scheduler.generate_many(["d", "bad"], on_error="", stage="locations")
+        metrics = scheduler.metrics()
+
+    assert metrics["submitted"] == 5
+    assert metrics["completed"] == 4
+    assert metrics["failed"] == 1
+    assert metrics["by_stage"] == {"judges": 3, "locations": 2}
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+    assert 1 <= metrics["max_queue_depth"] <= 3
+    assert metrics["latency_p50"] >= 0.05
+    assert metrics["latency_p95"] >= metrics["latency_p50"]
+    assert metrics["wait_p95"] >= metrics["wait_p50"] >= 0
+
+
+def test_closed_scheduler_refuses_prompts(client):
+    scheduler = PromptScheduler(client)
+    scheduler.close()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("prompt")
+
+
+def test_cached_prompts_skip_the_queue(tmp_path, ollama_stub):
+    ollama_stub.respond = _echo
+    cache = PromptCache(str(tmp_path / "cache.sqlite"))
+    client = OllamaClient(ollama_stub.url, cache=cache)
+    client.generate("seen")
+
+    with PromptScheduler(client, max_in_flight=2) as scheduler:
+        outputs = scheduler.generate_many(["seen", "new", "seen"])
+        metrics = scheduler.metrics()
+
+    assert outputs == ["answer to seen", "answer to new", "answer to seen"]
+    assert ollama_stub.prompts == ["seen", "new"]
+    assert metrics["submitted"] == 3
+    assert metrics["cache_hits"] == 2
+    assert metrics["completed"] == 1
+    assert metrics["batches"] == 1
+
+    # One miss from generate and one from the scheduler: the request itself does not look again
+    report = RunReport("test")
+    report.record("extract_decision_fields", model_calls=1)
+    report.attach("prompt_cache", cache.stats())
+    assert report.to_dict()["prompt_cache"] == {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 2,
+                                                "bytes": cache.stats()["bytes"]}
+    cache.close()